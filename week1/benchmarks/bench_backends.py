@@ -0,0 +1,91 @@
+"""Compare the torch / int8 / onnx backends for the local models.
+
+Each backend runs in its own interpreter so resident memory is measured in
+isolation; parity against fp32 is checked in a separate process that loads
+both. Run from the week1 directory:
+
+    python -m benchmarks.bench_backends --task sentiment --texts 64
+    python -m benchmarks.bench_backends --task summarizer --backends torch int8
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_pipeline import make_texts
+
+
+def run_backend(task, backend, n_texts, batch_size):
+    from utils.backends import load_sentiment, load_summarizer
+    from utils.metrics import rss_bytes, percentile
+    rss_start = rss_bytes()
+    start = time.perf_counter()
+    pipe = load_sentiment(backend) if task == "sentiment" else load_summarizer(backend)
+    load_s = time.perf_counter() - start
+    rss_loaded = rss_bytes()
+
+    texts = make_texts(n_texts, max_words=120)
+    kwargs = {"truncation": True} if task == "sentiment" else {"max_new_tokens": 32, "do_sample": False}
+    pipe(texts[:1], **kwargs)  # warm-up
+    latencies = []
+    for text in texts:
+        t = time.perf_counter()
+        pipe(text, **kwargs)
+        latencies.append(time.perf_counter() - t)
+    t = time.perf_counter()
+    pipe(texts, batch_size=batch_size, **kwargs)
+    batch_s = time.perf_counter() - t
+    return {
+        "task": task,
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "throughput_per_s": round(n_texts / batch_s, 2),
+        "model_rss_mb": round((rss_loaded - rss_start) / 1e6, 1),
+        "peak_rss_mb": round(rss_bytes() / 1e6, 1),
+    }
+
+
+def run_parity(task, backend, n_texts):
+    from utils.backends import load_sentiment, load_summarizer, sentiment_parity, summarizer_parity
+    texts = make_texts(n_texts, max_words=120, seed=1)
+    if task == "sentiment":
+        return sentiment_parity(load_sentiment("torch"), load_sentiment(backend), texts)
+    return summarizer_parity(load_summarizer("torch"), load_summarizer(backend), texts[:8])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--task", choices=["sentiment", "summarizer"], default="sentiment")
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--texts", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--child", choices=["bench", "parity"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        backend = args.backends[0]
+        if args.child == "bench":
+            result = run_backend(args.task, backend, args.texts, args.batch_size)
+        else:
+            result = run_parity(args.task, backend, args.texts)
+        print(json.dumps(result))
+        return
+
+    for backend in args.backends:
+        report = {}
+        for mode in ["bench"] + (["parity"] if backend != "torch" else []):
+            cmd = [sys.executable, "-m", "benchmarks.bench_backends", "--child", mode, "--task", args.task,
+                   "--backends", backend, "--texts", str(args.texts), "--batch-size", str(args.batch_size)]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                report[mode] = {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+            else:
+                report[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(json.dumps({"backend": backend, **report}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Offline latency/throughput benchmark for the week1 analysis pipeline.
+
+The Groq stage talks to the local mock server and the local stages use tiny
+Hugging Face models, so the run needs no API key or network (once the tiny
+models are in the local cache). Run from the week1 directory:
+
+    python -m benchmarks.bench_pipeline --requests 50 --concurrency 4
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_groq import start_mock_groq
+
+TINY_MODELS = {
+    "MISTRAL_MODEL": "sshleifer/tiny-gpt2",
+    "SENTIMENT_MODEL": "hf-internal-testing/tiny-random-DistilBertForSequenceClassification",
+}
+WORDS = "the model reads a long document and writes a short summary about markets science sport".split()
+
+
+def make_texts(n, min_words=20, max_words=400, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="simulated Groq latency (s)")
+    parser.add_argument("--real-models", action="store_true", help="use the configured models instead of tiny ones")
+    parser.add_argument("--cache", action="store_true", help="keep the result cache enabled")
+    args = parser.parse_args()
+
+    _, url = start_mock_groq(latency=args.groq_latency, jitter=args.groq_latency / 5)
+    # config reads these at import time, so set them before importing the app
+    os.environ["GROQ_API_URL"] = url
+    os.environ.setdefault("GROQ_API_KEY", "mock")
+    if not args.cache:
+        os.environ["RESULT_CACHE_ENABLED"] = "0"
+    if not args.real_models:
+        for key, value in TINY_MODELS.items():
+            os.environ.setdefault(key, value)
+    os.environ["WARMUP_MODELS"] = "summarizer,sentiment"
+
+    from config import WARMUP_MODELS
+    from utils.model_registry import registry
+    from utils.metrics import metrics
+    from main import analyze_text
+
+    load_start = time.perf_counter()
+    registry.warm_up(WARMUP_MODELS)
+    print(f"warm-up: {time.perf_counter() - load_start:.2f}s", file=sys.stderr)
+
+    texts = make_texts(args.requests)
+    analyze_text(texts[0])  # first-call overheads (NLTK, lazy imports)
+    metrics.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(analyze_text, texts))
+    wall = time.perf_counter() - start
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "wall_s": round(wall, 3),
+        "pipeline_throughput_per_s": round(args.requests / wall, 3),
+        "stages": metrics.summary(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
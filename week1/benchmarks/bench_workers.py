@@ -0,0 +1,51 @@
+"""Total memory of the pre-fork worker pool as the worker count grows.
+
+Runs a few requests through each pool size and reports the summed PSS
+(proportional set size) of the parent and its workers. Shared model pages
+are counted once, so the total should grow far slower than the worker count.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_pipeline import TINY_MODELS, make_texts
+
+
+def run(workers, n_texts):
+    from utils.worker_pool import PreforkPool
+    pool = PreforkPool(workers)
+    for text in make_texts(n_texts, max_words=200):
+        pool.call("sentiment_analysis", text)
+        pool.call("summarize_with_mistral", text)
+    memory = pool.memory()
+    pool.close()
+    return {"workers": workers, "total_pss_mb": memory["total_pss_mb"],
+            "parent_rss_mb": round(memory["parent"].get("rss", 0) / 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--texts", type=int, default=16)
+    parser.add_argument("--real-models", action="store_true")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run(args.child, args.texts)))
+        return
+    env = dict(os.environ)
+    if not args.real_models:
+        env.update(TINY_MODELS)
+    for workers in args.workers:
+        cmd = [sys.executable, "-m", "benchmarks.bench_workers", "--child", str(workers), "--texts", str(args.texts)]
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        print(proc.stdout.strip() if proc.returncode == 0 else json.dumps({"workers": workers, "error": proc.stderr.strip()[-300:]}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure the import (cold start) cost of the week1 modules.
+
+Each module is imported in a fresh interpreter so earlier imports don't hide
+the cost of later ones. Run from the week1 directory:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 5 utils.llm_helpers main
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+WEEK1_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_MODULES = ["config", "utils.llm_helpers", "utils.tokenizer_helpers", "main"]
+HEAVY_MODULES = ["torch", "transformers", "matplotlib", "nltk"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int = 3) -> dict:
+    runs, heavy = [], []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=WEEK1_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return {"module": module, "error": proc.stderr.strip().splitlines()[-1]}
+        data = json.loads(proc.stdout.strip().splitlines()[-1])
+        runs.append(data["seconds"])
+        heavy = data["heavy"]
+    return {
+        "module": module,
+        "median_s": round(statistics.median(runs), 4),
+        "min_s": round(min(runs), 4),
+        "heavy_imported": heavy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for module in args.modules:
+        print(json.dumps(measure(module, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
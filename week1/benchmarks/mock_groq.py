@@ -0,0 +1,87 @@
+"""Local stand-in for Groq's OpenAI-compatible chat-completions endpoint.
+
+Used by the tests and benchmarks so they never touch the network:
+
+    python -m benchmarks.mock_groq --port 8765 --latency 0.2
+    GROQ_API_URL=http://127.0.0.1:8765/openai/v1/chat/completions python main.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PATH = "/openai/v1/chat/completions"
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with server.lock:
+            server.requests += 1
+            fail = server.fail_every and server.requests % server.fail_every == 0
+        if self.path != PATH:
+            return self._send(404, {"error": {"message": "not found"}})
+        if fail:
+            return self._send(429, {"error": {"message": "rate limited"}}, {"Retry-After": "0"})
+        time.sleep(server.latency + random.uniform(0, server.jitter))
+        prompt = payload.get("messages", [{}])[-1].get("content", "")
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion = server.reply or " ".join(prompt.split()[:20])
+        completion_tokens = max(1, len(completion) // 4)
+        self._send(200, {
+            "id": f"mock-{server.requests}",
+            "object": "chat.completion",
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": completion}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+def start_mock_groq(host="127.0.0.1", port=0, latency=0.0, jitter=0.0, reply=None, fail_every=0):
+    """Start the mock server in a daemon thread; returns (server, chat-completions url)."""
+    server = ThreadingHTTPServer((host, port), MockGroqHandler)
+    server.daemon_threads = True
+    server.latency, server.jitter, server.reply, server.fail_every = latency, jitter, reply, fail_every
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{PATH}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with a 429")
+    args = parser.parse_args()
+    server, url = start_mock_groq(args.host, args.port, args.latency, args.jitter, fail_every=args.fail_every)
+    print(f"Mock Groq listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
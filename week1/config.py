@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,5 +7,61 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 HUGGINGFACE_API_KEY = os.getenv("HUGGING_FACE_KEY")
 
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+GROQ_POOL_SIZE = int(os.getenv("GROQ_POOL_SIZE", 10))
+
 LLAMA_MODEL = "llama3-8b-8192"   # Groq
-MISTRAL_MODEL = "openai/gpt-oss-120b"  # HuggingFace
+MISTRAL_MODEL = os.getenv("MISTRAL_MODEL", "openai/gpt-oss-120b")  # HuggingFace
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "distilbert-base-uncased-finetuned-sst-2-english")
+
+# Local model backend: "torch" (fp32), "int8" (dynamic quantization) or "onnx".
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+# Where the onnx backend keeps exported models, so they're exported only once.
+ONNX_CACHE_DIR = Path(os.getenv("ONNX_CACHE_DIR", Path(__file__).resolve().parent / "data" / "onnx"))
+
+# Model registry: total size budget for cached models (0 = unbounded) and
+# which models to load at startup (comma separated registry names).
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", 6 * 1024 ** 3))
+WARMUP_MODELS = [m for m in os.getenv("WARMUP_MODELS", "sentiment").split(",") if m.strip()]
+
+# analyze_text fan-out: worker threads shared by all requests for the local
+# stages and, separately, for the Groq calls (a timed-out Groq call keeps its
+# thread until the HTTP call gives up, so it must not hold the local stages'
+# threads), and per-stage timeouts in seconds (a stage that times out only
+# blanks its own panel).
+ANALYZE_MAX_WORKERS = int(os.getenv("ANALYZE_MAX_WORKERS", 8))
+REMOTE_MAX_WORKERS = int(os.getenv("REMOTE_MAX_WORKERS", GROQ_POOL_SIZE))
+STAGE_TIMEOUTS = {
+    "llama": float(os.getenv("LLAMA_TIMEOUT", 60)),
+    "mistral": float(os.getenv("MISTRAL_TIMEOUT", 120)),
+    "sentiment": float(os.getenv("SENTIMENT_TIMEOUT", 30)),
+    "stats": float(os.getenv("STATS_TIMEOUT", 30)),
+}
+
+# Offline mode: only use models / NLTK data already in the local cache.
+OFFLINE = os.getenv("WEEK1_OFFLINE", os.getenv("HF_HUB_OFFLINE", "0")).lower() in ("1", "true", "yes")
+if OFFLINE:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+RESULTS_DIR = Path(__file__).resolve().parent / "data" / "results"
+
+# Result cache for analyze_text stages: in-memory LRU in front of SQLite.
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+RESULT_CACHE_PATH = Path(os.getenv("RESULT_CACHE_PATH", RESULTS_DIR / "result_cache.sqlite"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 7 * 24 * 3600))  # seconds
+RESULT_CACHE_MEMORY_ITEMS = int(os.getenv("RESULT_CACHE_MEMORY_ITEMS", 512))
+RESULT_CACHE_MAX_ITEMS = int(os.getenv("RESULT_CACHE_MAX_ITEMS", 50000))
+
+# Serving: Gradio queue/concurrency limits, and micro-batching of the local
+# models (concurrent requests are grouped into one forward pass).
+SERVE_BATCHED = os.getenv("SERVE_BATCHED", "0").lower() in ("1", "true", "yes")
+CONCURRENCY_LIMIT = int(os.getenv("CONCURRENCY_LIMIT", 16))
+QUEUE_MAX_SIZE = int(os.getenv("QUEUE_MAX_SIZE", 128))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 16))
+MAX_BATCH_WAIT_MS = float(os.getenv("MAX_BATCH_WAIT_MS", 20))
+
+# Multi-worker serving: with SERVE_WORKERS > 1 the local models are loaded
+# once and shared by that many forked worker processes.
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", 0))
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", 1))
@@ -1,15 +1,117 @@
+import time
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as StageTimeout
 import gradio as gr
-from utils.llm_helpers import summarize_with_llama, summarize_with_mistral, sentiment_analysis, text_statistics
+from utils.llm_helpers import (
+    summarize_with_llama, summarize_with_mistral, sentiment_analysis, text_statistics, is_error,
+    summarize_batch_with_mistral, sentiment_analysis_batch, groq_transport_stats,
+)
 from utils.tokenizer_helpers import compare_tokenization
+from utils.model_registry import registry
+from utils.result_cache import cached_stage, result_cache
+from utils.metrics import metrics
+from utils.batching import MicroBatcher
+from utils.worker_pool import PreforkPool
+from config import (
+    WARMUP_MODELS, ANALYZE_MAX_WORKERS, REMOTE_MAX_WORKERS, STAGE_TIMEOUTS, SERVE_BATCHED, CONCURRENCY_LIMIT,
+    QUEUE_MAX_SIZE, MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS, SERVE_WORKERS, WORKER_THREADS,
+)
+
+# Forked before any of our threads start; the local model work then runs in
+# the workers while this process serves Gradio and the Groq calls.
+worker_pool = PreforkPool(SERVE_WORKERS, threads_per_worker=WORKER_THREADS) if SERVE_WORKERS > 1 else None
+
+
+def _local(fn, stage):
+    """Run a local-model helper in the worker pool when there is one.
+
+    Pool calls give up after the stage's timeout, so a worker that died or
+    hangs doesn't hold the calling thread forever.
+    """
+    if worker_pool is None:
+        return fn
+    return partial(worker_pool.call, fn.__name__, timeout=STAGE_TIMEOUTS[stage])
+
+
+batchers = {}
+if SERVE_BATCHED:
+    # Concurrent requests share one forward pass per micro-batch instead of
+    # contending for the CPU with one pass each.
+    summarize_batch = _local(summarize_batch_with_mistral, "mistral")
+    sentiment_batch = _local(sentiment_analysis_batch, "sentiment")
+    batchers["mistral"] = MicroBatcher(
+        lambda texts: summarize_batch(texts, batch_size=MAX_BATCH_SIZE),
+        MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS / 1000, max_queue=QUEUE_MAX_SIZE, name="mistral-batcher",
+    )
+    batchers["sentiment"] = MicroBatcher(
+        lambda texts: sentiment_batch(texts, batch_size=MAX_BATCH_SIZE),
+        MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS / 1000, max_queue=QUEUE_MAX_SIZE, name="sentiment-batcher",
+    )
+
+# Shared by all requests so concurrent users can't spawn unbounded threads.
+# The Groq calls get their own pool (no larger than the HTTP connection
+# pool), so slow or timed-out calls only queue further Groq calls and never
+# hold the threads the local stages need. With batching or worker processes,
+# local stage threads mostly wait on a result from elsewhere, so allow one
+# per local stage for every request Gradio may run.
+LOCAL_STAGES = 3
+remote_executor = ThreadPoolExecutor(max_workers=REMOTE_MAX_WORKERS, thread_name_prefix="analyze-remote")
+executor = ThreadPoolExecutor(
+    max_workers=max(ANALYZE_MAX_WORKERS, CONCURRENCY_LIMIT * LOCAL_STAGES) if SERVE_BATCHED or worker_pool else ANALYZE_MAX_WORKERS,
+    thread_name_prefix="analyze",
+)
+
+# Each stage is cached on its own (see utils/result_cache.py), so a resubmitted
+# text skips the Groq call, the local generation and the sentiment pass.
+# Timing wraps the cache, so cache hits show up as fast stage samples.
+STAGES = [
+    (name, pool, metrics.timed(name, cached_stage(name, fn)))
+    for name, pool, fn in [
+        ("llama", remote_executor, summarize_with_llama),
+        ("mistral", executor, batchers.get("mistral", _local(summarize_with_mistral, "mistral"))),
+        ("sentiment", executor, batchers.get("sentiment", _local(sentiment_analysis, "sentiment"))),
+        ("stats", executor, text_statistics),
+    ]
+]
+
+
+def _stage_result(name, future, deadline):
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except StageTimeout:
+        # A running future can't be cancelled; its thread finishes the call
+        # in the background, which shows up as `still_running` in the metrics.
+        metrics.record_timeout(name, future)
+        return {"error": f"{name} timed out after {STAGE_TIMEOUTS[name]:.0f}s"}
+    except Exception as e:
+        return {"error": f"{name} failed: {str(e)}"}
+
 
 def analyze_text(text):
-    llama = summarize_with_llama(text)
-    mistral = summarize_with_mistral(text)
-    sentiment = sentiment_analysis(text)
-    stats = text_statistics(text)
-    return llama, mistral, sentiment, stats
+    # The Groq call is network bound and overlaps with the local CPU work,
+    # so latency is roughly that of the slowest stage instead of the sum.
+    start = time.monotonic()
+    futures = [(name, pool.submit(fn, text)) for name, pool, fn in STAGES]
+    results = tuple(
+        _stage_result(name, future, start + STAGE_TIMEOUTS[name])
+        for name, future in futures
+    )
+    metrics.record("pipeline", time.monotonic() - start, ok=not any(map(is_error, results)))
+    return results
+
 
-iface = gr.Interface(
+def serving_stats():
+    return {
+        "batchers": {name: b.stats() for name, b in batchers.items()},
+        "stages": metrics.summary(),
+        "models": registry.stats(),
+        "result_cache": result_cache.stats() if result_cache is not None else None,
+        "groq": groq_transport_stats(),
+        "workers": worker_pool.stats() if worker_pool is not None else None,
+    }
+
+
+analysis = gr.Interface(
     fn=analyze_text,
     inputs=gr.Textbox(lines=10, placeholder="Enter text here..."),
     outputs=[
@@ -22,5 +124,18 @@ iface = gr.Interface(
     description="Summarization, Sentiment, Tokenization & Statistics"
 )
 
+stats_view = gr.Interface(
+    fn=serving_stats,
+    inputs=None,
+    outputs=gr.JSON(label="Queue, batching and stage metrics"),
+    title="Server Stats",
+)
+
+iface = gr.TabbedInterface([analysis, stats_view], ["Analyze", "Server Stats"])
+# Requests beyond QUEUE_MAX_SIZE are refused by Gradio instead of piling up.
+iface.queue(max_size=QUEUE_MAX_SIZE, default_concurrency_limit=CONCURRENCY_LIMIT)
+
 if __name__ == "__main__":
+    # Load the models up front so the first request doesn't pay for it.
+    registry.warm_up(WARMUP_MODELS)
     iface.launch()
@@ -0,0 +1,21 @@
+import os
+import pytest
+
+# Keep the suite offline and fast: tiny local models, no result cache.
+# These must be set before config.py is imported by the modules under test.
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("MISTRAL_MODEL", "sshleifer/tiny-gpt2")
+os.environ.setdefault("SENTIMENT_MODEL", "hf-internal-testing/tiny-random-DistilBertForSequenceClassification")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+
+MOCK_REPLY = "AI is reshaping industries."
+
+
+@pytest.fixture
+def mock_groq(monkeypatch):
+    from benchmarks.mock_groq import start_mock_groq
+    from utils import llm_helpers
+    server, url = start_mock_groq(reply=MOCK_REPLY)
+    monkeypatch.setattr(llm_helpers._groq, "url", url)
+    yield server
+    server.shutdown()
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("torch")
+from config import SENTIMENT_MODEL
+from utils import backends
+from utils.backends import load_sentiment, sentiment_parity
+
+TEXTS = [
+    "I loved this movie, the acting was wonderful.",
+    "Terrible service, I will never come back.",
+    "The package arrived on Tuesday.",
+    "Not bad at all, better than I expected!",
+]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return load_sentiment("torch", SENTIMENT_MODEL)
+
+
+def test_int8_backend_stays_close_to_fp32(reference):
+    report = sentiment_parity(reference, load_sentiment("int8", SENTIMENT_MODEL), TEXTS)
+    assert report["max_prob_diff"] < 0.05
+
+
+def test_onnx_backend_matches_fp32_and_reuses_its_export(reference, tmp_path, monkeypatch):
+    pytest.importorskip("optimum.onnxruntime")
+    monkeypatch.setattr(backends, "ONNX_CACHE_DIR", tmp_path)
+    candidate = load_sentiment("onnx", SENTIMENT_MODEL)
+    assert list(tmp_path.rglob("*.onnx"))
+
+    report = sentiment_parity(reference, candidate, TEXTS)
+    assert report == {"label_agreement": 1.0, "max_prob_diff": pytest.approx(0.0, abs=1e-3)}
+
+    cls = backends._onnx_class("sentiment")
+    exported = []
+    original = cls.from_pretrained
+    monkeypatch.setattr(cls, "from_pretrained", lambda *a, **k: exported.append(k.get("export")) or original(*a, **k))
+    load_sentiment("onnx", SENTIMENT_MODEL)
+    assert exported == [None]  # loaded from the cache, not exported again
@@ -0,0 +1,46 @@
+from utils.batching import length_buckets, run_bucketed
+
+
+def test_length_buckets_group_similar_lengths():
+    texts = ["aaaa", "a", "aaa", "aa", "aaaaa"]
+    buckets = length_buckets(texts, batch_size=2)
+    assert buckets == [[1, 3], [2, 0], [4]]
+
+
+def test_run_bucketed_preserves_input_order():
+    texts = ["ccc", "a", "bb", "dddd", ""]
+    seen = []
+
+    def upper(batch):
+        seen.append(batch)
+        return [t.upper() for t in batch]
+
+    assert run_bucketed(texts, upper, batch_size=2) == ["CCC", "A", "BB", "DDDD", ""]
+    assert all(len(b) <= 2 for b in seen)
+
+
+def test_micro_batcher_groups_concurrent_calls():
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.batching import MicroBatcher
+    batches = []
+
+    def double(items):
+        batches.append(len(items))
+        return [i * 2 for i in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait=0.05)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(batcher, range(16)))
+    assert results == [i * 2 for i in range(16)]
+    assert max(batches) > 1
+    stats = batcher.stats()
+    assert stats["batches"] == len(batches)
+    assert stats["queue_depth"] == 0
+
+
+def test_sliding_windows_cover_all_tokens_with_overlap():
+    from utils.batching import sliding_windows
+    assert sliding_windows(5, 10) == [(0, 5)]
+    spans = sliding_windows(25, 10, overlap=2)
+    assert spans == [(0, 10), (8, 18), (15, 25)]
+    assert all(e - s <= 10 for s, e in spans)
@@ -0,0 +1,33 @@
+from email.utils import formatdate
+import asyncio
+import time
+import pytest
+from utils.http_client import PooledJSONClient, parse_retry_after, retry_delay
+
+
+def test_parse_retry_after_seconds_and_date():
+    assert parse_retry_after({"retry-after": "3"}) == 3.0
+    assert parse_retry_after({}) is None
+    future = formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= parse_retry_after({"Retry-After": future}) <= 31
+
+
+def test_retry_delay_honors_hint_and_jitters():
+    assert 5.0 <= retry_delay(1, backoff=2, retry_after=5.0) <= 5.2
+    delays = {retry_delay(3, backoff=2) for _ in range(20)}
+    assert all(0 <= d <= 8 for d in delays)
+    assert len(delays) > 1
+
+
+def test_async_clients_of_closed_loops_are_dropped():
+    pytest.importorskip("httpx")
+    client = PooledJSONClient("http://127.0.0.1:9/")
+
+    async def lookup():
+        return client._async_client()
+
+    first = asyncio.run(lookup())
+    second = asyncio.run(lookup())
+    assert first is not second
+    assert list(client._async_clients.values()) == [second]
+    assert client.stats()["async_clients_open"] == 1
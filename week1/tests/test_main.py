@@ -1,11 +1,37 @@
 from utils.llm_helpers import summarize_with_llama, summarize_with_mistral
+from conftest import MOCK_REPLY
 
-def test_llama_summary():
+def test_llama_summary(mock_groq):
     text = "AI is transforming industries."
     result = summarize_with_llama(text)
-    assert "summary" in result
+    assert result["summary"] == MOCK_REPLY
+    assert result["tokens"] > 0
+
+def test_llama_summary_retries_rate_limit(mock_groq):
+    mock_groq.fail_every = 2
+    results = [summarize_with_llama("AI is transforming industries.", backoff=0.01) for _ in range(3)]
+    assert all(r["summary"] == MOCK_REPLY for r in results)
 
 def test_mistral_summary():
     text = "AI is transforming industries."
     result = summarize_with_mistral(text)
     assert "summary" in result
+    assert not result["summary"].startswith("Error:")
+
+def test_analyze_text_records_stage_metrics(mock_groq):
+    from main import analyze_text
+    from utils.metrics import metrics
+    metrics.reset()
+    llama, mistral, sentiment, stats = analyze_text("AI is transforming industries.")
+    assert llama["summary"] == MOCK_REPLY
+    assert stats["total_words"] == 5
+    summary = metrics.summary()
+    assert {"llama", "mistral", "sentiment", "stats", "pipeline"} <= set(summary)
+    assert summary["llama"]["tokens"] > 0
+
+def test_serving_stats_include_caches_and_transport(mock_groq):
+    from main import analyze_text, serving_stats
+    analyze_text("AI is transforming industries.")
+    stats = serving_stats()
+    assert {"batchers", "stages", "models", "result_cache", "groq", "workers"} <= set(stats)
+    assert stats["result_cache"] is None  # disabled in conftest
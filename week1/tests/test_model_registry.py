@@ -0,0 +1,41 @@
+import pytest
+from utils.model_registry import ModelRegistry
+
+
+def make_registry(max_bytes=0, sizes=None):
+    sizes = sizes or {}
+    calls = []
+    reg = ModelRegistry(max_bytes=max_bytes, size_fn=lambda obj: sizes.get(obj, 0))
+    for name in ("a", "b", "c"):
+        reg.register(name, lambda name=name: calls.append(name) or name)
+    return reg, calls
+
+
+def test_loads_once_and_counts_hits():
+    reg, calls = make_registry()
+    assert reg.get("a") == "a"
+    assert reg.get("a") == "a"
+    assert calls == ["a"]
+    stats = reg.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert "a" in stats["load_time_s"]
+
+
+def test_lru_eviction_over_budget():
+    reg, calls = make_registry(max_bytes=25, sizes={"a": 10, "b": 10, "c": 10})
+    reg.get("a")
+    reg.get("b")
+    reg.get("a")  # a is now most recently used
+    reg.get("c")
+    assert reg.loaded() == ["a", "c"]
+    assert reg.stats()["evictions"] == 1
+    reg.get("b")
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_warm_up_and_unknown_model():
+    reg, calls = make_registry()
+    reg.warm_up(["b", "c"])
+    assert calls == ["b", "c"]
+    with pytest.raises(KeyError):
+        reg.get("missing")
@@ -0,0 +1,45 @@
+import time
+from utils.result_cache import ResultCache, stage_identity
+
+
+def make_cache(tmp_path, **kwargs):
+    return ResultCache(path=tmp_path / "cache.sqlite", identity={"stage": "model-a"}, **kwargs)
+
+
+def test_cached_stage_memory_and_disk_hits(tmp_path):
+    calls = []
+    cache = make_cache(tmp_path)
+    fn = cache.cached("stage", lambda text: calls.append(text) or {"summary": text.upper()})
+    assert fn("hello") == {"summary": "HELLO"}
+    assert fn("hello") == {"summary": "HELLO"}
+    assert calls == ["hello"]
+
+    # a fresh process only has the disk tier
+    reopened = make_cache(tmp_path)
+    assert reopened.get("stage", "hello") == {"summary": "HELLO"}
+    assert reopened.stats()["stage"]["disk_hits"] == 1
+    assert cache.stats()["stage"]["memory_hits"] == 1
+
+
+def test_errors_not_cached_and_ttl_expiry(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05)
+    fn = cache.cached("stage", lambda text: {"summary": "Error: boom"})
+    fn("x")
+    assert cache.get("stage", "x") is None
+    cache.set("stage", "y", {"summary": "ok"})
+    time.sleep(0.06)
+    assert cache.get("stage", "y") is None
+
+
+def test_identity_changes_key(tmp_path):
+    cache = make_cache(tmp_path)
+    other = ResultCache(path=tmp_path / "cache.sqlite", identity={"stage": "model-b"})
+    assert cache.key("stage", "text") != other.key("stage", "text")
+
+
+
+def test_local_stage_identity_includes_backend():
+    fp32, int8 = stage_identity("torch"), stage_identity("int8")
+    assert fp32["sentiment"] != int8["sentiment"]
+    assert fp32["mistral"] != int8["mistral"]
+    assert fp32["llama"] == int8["llama"]
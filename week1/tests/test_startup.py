@@ -0,0 +1,18 @@
+import subprocess, sys
+from pathlib import Path
+
+WEEK1_DIR = Path(__file__).resolve().parents[1]
+
+
+def _imported_after(module):
+    code = (
+        f"import sys, {module}; "
+        "print(','.join(m for m in ('torch', 'transformers', 'matplotlib', 'nltk') if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=WEEK1_DIR, capture_output=True, text=True, check=True)
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+
+def test_helpers_import_without_heavy_libraries():
+    assert _imported_after("utils.llm_helpers") == []
+    assert _imported_after("utils.tokenizer_helpers") == []
@@ -0,0 +1,17 @@
+from utils.text_stats import text_statistics, text_statistics_file
+
+
+def test_file_stats_match_in_memory_stats(tmp_path):
+    text = "The cat sat on the mat. The dog sat on the log.\n" * 500
+    path = tmp_path / "sample.txt"
+    path.write_text(text, encoding="utf-8")
+    expected = text_statistics(text)
+    assert text_statistics_file(path, chunk_size=64) == expected
+    assert text_statistics_file(path, chunk_size=64, workers=2) == expected
+    assert expected["most_common"][0] == ("the", 2000)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    assert text_statistics_file(path) == {"total_words": 0, "unique_words": 0, "most_common": []}
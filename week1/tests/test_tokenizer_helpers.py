@@ -0,0 +1,70 @@
+import pytest
+
+from config import MISTRAL_MODEL
+from utils import tokenizer_helpers
+from utils.model_registry import registry
+from utils.tokenizer_helpers import TokenCountCache, compare_tokenization_batch, count_tokens_batch
+
+TEXTS = [
+    "Tokenizers split text into subword units.",
+    "Short one.",
+    "",
+    "Unusual words like antidisestablishmentarianism split into many pieces.",
+    "Short one.",
+]
+
+
+def test_cache_hits_and_lru_eviction(tmp_path):
+    cache = TokenCountCache(max_entries=2)
+    a, b, c = (cache.key("gpt2", t) for t in ("a", "b", "c"))
+    cache.update({a: 1, b: 2})
+    assert cache.get(a) == 1  # `a` is now the most recently used
+    cache.update({c: 3})
+    assert cache.get(b) is None
+    assert (cache.get(a), cache.get(c)) == (1, 3)
+    assert cache.stats() == {"hits": 3, "misses": 1, "hit_ratio": 0.75, "size": 2, "evictions": 1}
+
+    path = tmp_path / "counts.json"
+    cache.save(path)
+    assert TokenCountCache(path).counts == {a: 1, c: 3}
+
+
+def test_key_depends_on_tokenizer_and_text():
+    assert TokenCountCache.key("gpt2", "x") != TokenCountCache.key("bert", "x")
+    assert TokenCountCache.key("gpt2", "x") != TokenCountCache.key("gpt2", "y")
+
+
+@pytest.fixture
+def tiny_tokenizer(monkeypatch):
+    pytest.importorskip("numpy")
+    pytest.importorskip("transformers")
+    registry.register("tiny_tokenizer", lambda: tokenizer_helpers._load_tokenizer(MISTRAL_MODEL))
+    monkeypatch.setitem(tokenizer_helpers.TOKENIZERS, "tiny", "tiny_tokenizer")
+    return registry.get("tiny_tokenizer")
+
+
+def expected_counts(tokenizer, texts):
+    # batch counts include special tokens, like `count_tokens`
+    return [len(tokenizer.tokenize(t)) + tokenizer.num_special_tokens_to_add() for t in texts]
+
+
+def test_batch_counts_match_per_text_tokenize(tiny_tokenizer):
+    counts = count_tokens_batch("tiny", TEXTS, batch_size=2)
+    assert counts.tolist() == expected_counts(tiny_tokenizer, TEXTS)
+
+
+def test_batch_counts_use_cache(tiny_tokenizer):
+    cache = TokenCountCache()
+    first = count_tokens_batch("tiny", TEXTS, cache=cache)
+    assert cache.stats()["misses"] == len(TEXTS)
+    assert cache.stats()["size"] == len(set(TEXTS))
+    second = count_tokens_batch("tiny", TEXTS, cache=cache)
+    assert second.tolist() == first.tolist()
+    assert cache.stats()["hits"] == len(TEXTS)
+
+
+def test_compare_batch_process_pool_matches_serial(tiny_tokenizer):
+    # more missing texts than `batch_size`, so the work is split across processes
+    texts = [f"{t} #{i}" for i in range(10) for t in TEXTS]
+    pooled = compare_tokenization_batch(texts, tokenizers=("tiny",), batch_size=4, workers=2)
+    assert pooled["tiny"].tolist() == expected_counts(tiny_tokenizer, texts)
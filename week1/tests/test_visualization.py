@@ -0,0 +1,25 @@
+import numpy as np
+from utils.visualization import length_histogram, plot_distributions
+
+
+def test_length_histogram_clips_long_tokens():
+    hist = length_histogram([1, 1, 3, 25, 40], max_len=5)
+    assert hist.tolist() == [2, 0, 1, 0, 2]
+
+
+def test_plot_distributions_writes_png_headless(tmp_path):
+    rng = np.random.default_rng(0)
+    lengths = {"gpt2": rng.integers(1, 12, 5000), "bert": rng.integers(1, 10, 6000)}
+    path = plot_distributions(lengths, "many tokens", tmp_path / "dist.png")
+    assert path.read_bytes()[:4] == b"\x89PNG"
+
+
+def test_render_keeps_documents_with_the_same_name_apart(tmp_path, monkeypatch):
+    from utils import visualization
+    lengths = [np.array([1, 2, 3]), np.array([4, 5]), np.array([2, 2])]
+    monkeypatch.setattr(visualization, "token_lengths", lambda name, docs: lengths)
+    paths = visualization.render_token_distributions(
+        ["a", "b", "c"], tokenizers=("gpt2",), outdir=tmp_path, names=["same?", "same!", "other"], workers=2,
+    )
+    assert len(set(paths)) == 3
+    assert all(p.read_bytes()[:4] == b"\x89PNG" for p in paths)
@@ -0,0 +1,48 @@
+import gc, multiprocessing, os, time
+import pytest
+
+from utils import worker_pool
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+
+
+def fake_call(name, args, kwargs):
+    if name == "die":
+        os._exit(1)
+    if name == "hang":
+        time.sleep(args[0])
+    if name == "fail":
+        raise ValueError("bad input")
+    return name, args, kwargs
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # no models to load; the forked workers pick up the patched `_call`
+    monkeypatch.setattr(worker_pool.registry, "warm_up", lambda models: None)
+    monkeypatch.setattr(worker_pool, "_call", fake_call)
+    pool = worker_pool.PreforkPool(2)
+    yield pool
+    pool.close()
+    gc.unfreeze()
+
+
+def test_call_round_trip_and_errors(pool):
+    assert pool.call("echo", 1, timeout=5, flag=True) == ("echo", (1,), {"flag": True})
+    with pytest.raises(ValueError, match="bad input"):
+        pool.call("fail", timeout=5)
+
+
+def test_timeout_leaves_the_pool_usable(pool):
+    with pytest.raises(TimeoutError, match="hang got no result"):
+        pool.call("hang", 2, timeout=0.2)
+    assert pool.call("echo", timeout=5)[0] == "echo"
+    assert pool.stats()["timed_out"] == 1
+
+
+def test_dead_workers_are_not_replaced(pool):
+    with pytest.raises(TimeoutError, match="died and were not replaced"):
+        pool.call("die", timeout=1)
+    stats = pool.stats()
+    assert (stats["alive"], stats["died"]) == (1, 1)
+    assert pool.call("echo", timeout=5)[0] == "echo"
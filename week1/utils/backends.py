@@ -0,0 +1,114 @@
+"""Loaders for the local models on different CPU inference backends.
+
+- ``torch``: full-precision PyTorch (the original behaviour)
+- ``int8``:  PyTorch with dynamic int8 quantization of the Linear layers
+- ``onnx``:  exported to ONNX and run with ONNX Runtime (needs ``optimum[onnxruntime]``,
+  see requirements-onnx.txt); the export is saved under ``ONNX_CACHE_DIR``
+  and reused on later starts
+"""
+import logging
+import re
+from config import HUGGINGFACE_API_KEY, MISTRAL_MODEL, SENTIMENT_MODEL, OFFLINE, ONNX_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "int8", "onnx")
+
+
+def _check(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+
+
+def _quantize(model):
+    import torch
+    model.eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _onnx_class(task):
+    try:
+        from optimum.onnxruntime import ORTModelForCausalLM, ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError("The onnx backend needs `pip install optimum[onnxruntime]`") from e
+    return ORTModelForSequenceClassification if task == "sentiment" else ORTModelForCausalLM
+
+
+def _load_onnx(task, model_name, **kwargs):
+    """ONNX model from the export cache, exporting (and saving) it on the first load.
+
+    Delete the cached directory to re-export, e.g. after upgrading optimum.
+    """
+    cls = _onnx_class(task)
+    path = ONNX_CACHE_DIR / task / re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name)
+    if path.is_dir() and any(path.glob("*.onnx")):
+        return cls.from_pretrained(path)
+    logger.info("Exporting %s to ONNX under %s", model_name, path)
+    model = cls.from_pretrained(model_name, export=True, local_files_only=OFFLINE, **kwargs)
+    model.save_pretrained(path)
+    return model
+
+
+def load_sentiment(backend="torch", model_name=SENTIMENT_MODEL):
+    _check(backend)
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+    tokenizer = AutoTokenizer.from_pretrained(model_name, local_files_only=OFFLINE)
+    if backend == "onnx":
+        model = _load_onnx("sentiment", model_name)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, local_files_only=OFFLINE)
+        if backend == "int8":
+            model = _quantize(model)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def load_summarizer(backend="torch", model_name=MISTRAL_MODEL):
+    _check(backend)
+    from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_auth_token=HUGGINGFACE_API_KEY, local_files_only=OFFLINE)
+    # Decoder-only models need left padding (and a pad token) for batched generation.
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    if backend == "onnx":
+        model = _load_onnx("summarizer", model_name, use_auth_token=HUGGINGFACE_API_KEY)
+    else:
+        model = AutoModelForCausalLM.from_pretrained(model_name, use_auth_token=HUGGINGFACE_API_KEY, local_files_only=OFFLINE)
+        if backend == "int8":
+            model = _quantize(model)
+    return pipeline("text-generation", model=model, tokenizer=tokenizer, max_new_tokens=200)
+
+
+def sentiment_parity(reference, candidate, texts) -> dict:
+    """Compare a candidate sentiment pipeline against the fp32 reference.
+
+    Reports label agreement and the largest absolute difference in the
+    positive-class probability.
+    """
+    ref = reference(list(texts), top_k=None, truncation=True)
+    cand = candidate(list(texts), top_k=None, truncation=True)
+    agree, max_diff = 0, 0.0
+    for r, c in zip(ref, cand):
+        r_scores = {d["label"]: d["score"] for d in r}
+        c_scores = {d["label"]: d["score"] for d in c}
+        agree += max(r_scores, key=r_scores.get) == max(c_scores, key=c_scores.get)
+        max_diff = max(max_diff, max(abs(r_scores[k] - c_scores.get(k, 0.0)) for k in r_scores))
+    return {"label_agreement": agree / len(ref) if ref else 1.0, "max_prob_diff": round(max_diff, 5)}
+
+
+def summarizer_parity(reference, candidate, prompts, max_new_tokens=32) -> dict:
+    """Greedy-decode both summarizers and report exact and token-level agreement."""
+    tokenizer = reference.tokenizer
+    kwargs = dict(max_new_tokens=max_new_tokens, do_sample=False, return_full_text=False)
+    ref = [out[0]["generated_text"] for out in reference(list(prompts), **kwargs)]
+    cand = [out[0]["generated_text"] for out in candidate(list(prompts), **kwargs)]
+    exact, token_agree = 0, []
+    for r, c in zip(ref, cand):
+        exact += r == c
+        r_ids, c_ids = tokenizer.encode(r), tokenizer.encode(c)
+        n = max(len(r_ids), len(c_ids), 1)
+        token_agree.append(sum(a == b for a, b in zip(r_ids, c_ids)) / n)
+    return {
+        "exact_match": exact / len(ref) if ref else 1.0,
+        "mean_token_agreement": round(sum(token_agree) / len(token_agree), 4) if token_agree else 1.0,
+    }
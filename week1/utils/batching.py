@@ -0,0 +1,118 @@
+import collections, queue, threading, time
+from concurrent.futures import Future
+
+
+def length_buckets(texts, batch_size: int, key=len):
+    """Group indices of `texts` into batches of similar length.
+
+    Sorting by length before batching keeps padding inside each batch small;
+    callers use the returned indices to put results back in input order.
+    """
+    order = sorted(range(len(texts)), key=lambda i: key(texts[i]))
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def run_bucketed(texts, fn, batch_size: int, key=len):
+    """Apply the batch function `fn` bucket by bucket and return results in input order."""
+    results = [None] * len(texts)
+    for bucket in length_buckets(texts, batch_size, key=key):
+        outputs = fn([texts[i] for i in bucket])
+        for i, out in zip(bucket, outputs):
+            results[i] = out
+    return results
+
+
+class MicroBatcher:
+    """Collect concurrent single-item calls into micro-batches for a batch function.
+
+    A background thread takes the first waiting item, then keeps collecting until
+    `max_batch_size` items are queued or `max_wait` seconds have passed, and
+    runs `batch_fn(items)` once for all of them. Callers block on their own
+    future. When `max_queue` items are already waiting, `submit` raises
+    `queue.Full` so overload is visible instead of piling up.
+    """
+
+    def __init__(self, batch_fn, max_batch_size: int = 16, max_wait: float = 0.02, max_queue: int = 256, name: str = "batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._waits = collections.deque(maxlen=10000)
+        self._batch_sizes = collections.deque(maxlen=10000)
+        self.rejected = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise queue.Full(f"{self.name} queue is full ({self._queue.maxsize} waiting)")
+        return future
+
+    def __call__(self, item, timeout: float = None):
+        return self.submit(item).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            with self._lock:
+                self._batch_sizes.append(len(batch))
+                self._waits.extend(started - enqueued for _, _, enqueued in batch)
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self) -> dict:
+        from utils.metrics import percentile
+        with self._lock:
+            waits = list(self._waits)
+            sizes = list(self._batch_sizes)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "batches": len(sizes),
+                "mean_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+                "wait_p50_ms": round(percentile(waits, 50) * 1000, 2),
+                "wait_p95_ms": round(percentile(waits, 95) * 1000, 2),
+                "rejected": self.rejected,
+            }
+
+
+def sliding_windows(n_tokens: int, window: int, overlap: int = 0):
+    """(start, end) spans covering `n_tokens` with windows of at most `window` tokens.
+
+    Consecutive windows share `overlap` tokens; the last window ends exactly at
+    `n_tokens`. Zero tokens still give one (empty) window.
+    """
+    if window <= overlap:
+        raise ValueError("window must be larger than overlap")
+    if n_tokens <= window:
+        return [(0, n_tokens)]
+    step = window - overlap
+    spans = [(start, start + window) for start in range(0, n_tokens - window, step)]
+    spans.append((n_tokens - window, n_tokens))
+    return spans
@@ -0,0 +1,155 @@
+import asyncio, random, threading, time, logging
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_WAIT = 60.0
+
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(headers) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = (headers or {}).get("retry-after") or (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def retry_delay(attempt: int, backoff: float, retry_after=None) -> float:
+    """Honor the server's hint when given, otherwise exponential backoff with full jitter."""
+    if retry_after is not None:
+        return min(MAX_WAIT, retry_after + random.uniform(0, 0.1 * backoff))
+    return random.uniform(0, min(MAX_WAIT, backoff ** attempt))
+
+
+class PooledJSONClient:
+    """Keep-alive JSON POST client with retries, shared by all callers.
+
+    The sync path reuses one `requests.Session` (urllib3 connection pool); the
+    async path uses a lazily created `httpx.AsyncClient`, one per event loop.
+    An AsyncClient can only be closed on its own loop, so the clients of loops
+    that have closed (e.g. after `asyncio.run`) are dropped, with their
+    connections, the next time a client is looked up.
+    """
+
+    def __init__(self, url, headers=None, pool_size=10, timeout=30):
+        self.url = url
+        self.headers = headers or {}
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+        self._async_clients = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.async_requests = 0
+        self.retries = 0
+        self.wait_time = 0.0
+        self.async_connections = 0
+
+    def _check(self, status_code, headers, body_text):
+        if status_code in RETRY_STATUSES:
+            raise RetryableError(f"HTTP {status_code}: {body_text[:200]}", parse_retry_after(headers))
+        if status_code >= 400:
+            raise requests.HTTPError(f"HTTP {status_code}: {body_text[:200]}")
+
+    def _record(self, delay=None, is_async=False):
+        with self._lock:
+            if delay is None:
+                if is_async:
+                    self.async_requests += 1
+                else:
+                    self.requests += 1
+            else:
+                self.retries += 1
+                self.wait_time += delay
+
+    def post(self, payload, retries=3, backoff=2):
+        for attempt in range(1, retries + 1):
+            self._record()
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                self._check(response.status_code, response.headers, response.text)
+                return response.json()
+            except (RetryableError, requests.ConnectionError, requests.Timeout) as e:
+                if attempt == retries:
+                    raise
+                delay = retry_delay(attempt, backoff, getattr(e, "retry_after", None))
+                logger.warning("POST %s failed (attempt %d/%d): %s; retrying in %.2fs", self.url, attempt, retries, e, delay)
+                self._record(delay)
+                time.sleep(delay)
+
+    def _async_client(self):
+        import httpx
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for closed in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed]
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+                client = httpx.AsyncClient(headers=self.headers, timeout=self.timeout, limits=limits)
+                self._async_clients[loop] = client
+                self.async_connections += 1
+            return client
+
+    async def apost(self, payload, retries=3, backoff=2):
+        import httpx
+        client = self._async_client()
+        for attempt in range(1, retries + 1):
+            self._record(is_async=True)
+            try:
+                response = await client.post(self.url, json=payload)
+                self._check(response.status_code, response.headers, response.text)
+                return response.json()
+            except (RetryableError, httpx.TransportError) as e:
+                if attempt == retries:
+                    raise
+                delay = retry_delay(attempt, backoff, getattr(e, "retry_after", None))
+                logger.warning("POST %s failed (attempt %d/%d): %s; retrying in %.2fs", self.url, attempt, retries, e, delay)
+                self._record(delay)
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        # urllib3 counts every new connection it opens, so the difference from
+        # the number of requests is how many reused a kept-alive connection.
+        opened = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                opened += pools[key].num_connections
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": opened,
+                "connections_reused": max(0, self.requests - opened),
+                "async_requests": self.async_requests,
+                "async_clients": self.async_connections,
+                "async_clients_open": len(self._async_clients),
+                "retries": self.retries,
+                "retry_wait_s": round(self.wait_time, 3),
+            }
@@ -1,15 +1,42 @@
-import requests, time, re
-from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
-from config import GROQ_API_KEY, HUGGINGFACE_API_KEY, LLAMA_MODEL, MISTRAL_MODEL
+import re, logging
+from config import GROQ_API_URL, GROQ_POOL_SIZE, GROQ_API_KEY, LLAMA_MODEL, MODEL_CACHE_MAX_BYTES, INFERENCE_BACKEND
+from utils.model_registry import registry
+from utils.batching import run_bucketed, sliding_windows
+from utils.http_client import PooledJSONClient
+from utils.backends import load_sentiment, load_summarizer
+
+logger = logging.getLogger(__name__)
+
+registry.max_bytes = MODEL_CACHE_MAX_BYTES
+
+
+# transformers is only imported when a model is actually loaded, so importing
+# this module (and starting the app) stays cheap. INFERENCE_BACKEND picks
+# fp32 PyTorch, dynamic int8 or ONNX Runtime (see utils/backends.py).
+registry.register("summarizer", lambda: load_summarizer(INFERENCE_BACKEND))
+registry.register("sentiment", lambda: load_sentiment(INFERENCE_BACKEND))
+
 
 def estimate_cost(tokens: int, price_per_1k=0.0):
     return (tokens or 0) / 1000 * price_per_1k
 
 
-def summarize_with_llama(text: str, retries=3, backoff=2) -> dict:
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-    payload = {
+def is_error(result) -> bool:
+    """True for the error dicts the helpers return instead of raising."""
+    if isinstance(result, dict):
+        return "error" in result or str(result.get("summary", "")).startswith("Error:")
+    return False
+
+
+_groq = PooledJSONClient(
+    GROQ_API_URL,
+    headers={"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"},
+    pool_size=GROQ_POOL_SIZE,
+)
+
+
+def _llama_payload(text: str) -> dict:
+    return {
         "model": LLAMA_MODEL,
         "messages": [
             {"role": "system", "content": "You are a helpful assistant that summarizes text."},
@@ -18,28 +45,41 @@ def summarize_with_llama(text: str, retries=3, backoff=2) -> dict:
         "temperature": 0.5,
         "max_tokens": 300,
     }
-    for attempt in range(1, retries+1):
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            summary = data["choices"][0]["message"]["content"]
-            tokens = data.get("usage", {}).get("total_tokens", 0)
-            return {"summary": summary, "tokens": tokens, "cost": estimate_cost(tokens)}
-        except Exception as e:
-            if attempt < retries:
-                time.sleep(backoff ** attempt)
-            else:
-                return {"summary": f"Error: {str(e)}", "tokens": 0, "cost": 0}
 
 
+def _llama_result(data: dict) -> dict:
+    summary = data["choices"][0]["message"]["content"]
+    tokens = data.get("usage", {}).get("total_tokens", 0)
+    return {"summary": summary, "tokens": tokens, "cost": estimate_cost(tokens)}
+
+
+def summarize_with_llama(text: str, retries=3, backoff=2) -> dict:
+    try:
+        return _llama_result(_groq.post(_llama_payload(text), retries=retries, backoff=backoff))
+    except Exception as e:
+        return {"summary": f"Error: {str(e)}", "tokens": 0, "cost": 0}
+
+
+async def summarize_with_llama_async(text: str, retries=3, backoff=2) -> dict:
+    try:
+        return _llama_result(await _groq.apost(_llama_payload(text), retries=retries, backoff=backoff))
+    except Exception as e:
+        return {"summary": f"Error: {str(e)}", "tokens": 0, "cost": 0}
+
+
+def groq_transport_stats() -> dict:
+    return _groq.stats()
+
+
+def _summary_prompt(text: str) -> str:
+    return f"Summarize this text concisely:\n\n{text}\n\nSummary:"
+
 
 def summarize_with_mistral(text: str) -> dict:
     try:
-        tokenizer = AutoTokenizer.from_pretrained(MISTRAL_MODEL, use_auth_token=HUGGINGFACE_API_KEY)
-        model = AutoModelForCausalLM.from_pretrained(MISTRAL_MODEL, use_auth_token=HUGGINGFACE_API_KEY)
-        summarizer = pipeline("text-generation", model=model, tokenizer=tokenizer, max_new_tokens=200)
-        prompt = f"Summarize this text concisely:\n\n{text}\n\nSummary:"
+        summarizer = registry.get("summarizer")
+        tokenizer = summarizer.tokenizer
+        prompt = _summary_prompt(text)
         output = summarizer(prompt)[0]["generated_text"]
         tokens = len(tokenizer.encode(text))
         return {"summary": output, "tokens": tokens, "cost": estimate_cost(tokens)}
@@ -47,23 +87,119 @@ def summarize_with_mistral(text: str) -> dict:
         return {"summary": f"Error: {str(e)}", "tokens": 0, "cost": 0}
 
 
+def _token_counts(sentiment_model, texts) -> tuple:
+    """Token counts of `texts` (without special tokens) and how many fit one model window."""
+    tokenizer = sentiment_model.tokenizer
+    budget = min(tokenizer.model_max_length, 512) - tokenizer.num_special_tokens_to_add()
+    counts = [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)["input_ids"]] if texts else []
+    return counts, budget
+
+
 def sentiment_analysis(text: str) -> dict:
-    sentiment_model = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-    return sentiment_model(text)[0]
+    """Label and score, plus the `chunks` and `tokens` the text took (as in the chunked path)."""
+    sentiment_model = registry.get("sentiment")
+    (tokens,), budget = _token_counts(sentiment_model, [text])
+    if tokens <= budget:
+        return {**sentiment_model(text, truncation=True)[0], "chunks": 1, "tokens": tokens}
+    return sentiment_analysis_chunked(text)
 
 
-from collections import Counter
-import nltk
-nltk.download("punkt")
-from nltk.tokenize import word_tokenize
+def sentiment_analysis_chunked(text: str, max_tokens: int = 512, overlap: int = 64, batch_size: int = 32) -> dict:
+    """Sentiment for arbitrarily long text via overlapping token windows.
 
-def text_statistics(text: str):
-    words = word_tokenize(text.lower())
-    freq = Counter(words)
-    total_words = len(words)
-    unique_words = len(freq)
+    The text is tokenized once and cut into windows that fit the model; windows
+    go through the model together (at most `batch_size` per forward pass, so
+    memory stays bounded) and the label probabilities are averaged, weighted
+    by each window's token count.
+    """
+    import torch
+    sentiment_model = registry.get("sentiment")
+    tokenizer, model = sentiment_model.tokenizer, sentiment_model.model
+    max_tokens = min(max_tokens, tokenizer.model_max_length)
+    window = max_tokens - tokenizer.num_special_tokens_to_add()
+    ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+    spans = sliding_windows(len(ids), window, min(overlap, window - 1))
+
+    total = None
+    weights = 0
+    for i in range(0, len(spans), batch_size):
+        group = spans[i:i + batch_size]
+        inputs = tokenizer.pad(
+            {"input_ids": [tokenizer.build_inputs_with_special_tokens(ids[s:e]) for s, e in group]},
+            return_tensors="pt",
+        )
+        with torch.no_grad():
+            probs = model(**inputs.to(model.device)).logits.softmax(dim=-1)
+        lengths = torch.tensor([max(1, e - s) for s, e in group], dtype=probs.dtype, device=probs.device)
+        weighted = (probs * lengths[:, None]).sum(dim=0)
+        total = weighted if total is None else total + weighted
+        weights += float(lengths.sum())
+    probs = total / weights
+    best = int(probs.argmax())
     return {
-        "total_words": total_words,
-        "unique_words": unique_words,
-        "most_common": freq.most_common(10),
+        "label": model.config.id2label[best],
+        "score": float(probs[best]),
+        "chunks": len(spans),
+        "tokens": len(ids),
     }
+
+
+def summarize_batch_with_mistral(texts, batch_size=8) -> list:
+    try:
+        summarizer = registry.get("summarizer")
+    except Exception as e:
+        return [{"summary": f"Error: {str(e)}", "tokens": 0, "cost": 0} for _ in texts]
+    tokenizer = summarizer.tokenizer
+    token_counts = [len(ids) for ids in tokenizer(list(texts))["input_ids"]] if texts else []
+
+    def run(batch):
+        outputs = summarizer([_summary_prompt(t) for t in batch], batch_size=len(batch))
+        return [out[0]["generated_text"] for out in outputs]
+
+    try:
+        summaries = run_bucketed(list(texts), run, batch_size, key=len)
+    except Exception as e:
+        return [{"summary": f"Error: {str(e)}", "tokens": 0, "cost": 0} for _ in texts]
+    return [
+        {"summary": summary, "tokens": tokens, "cost": estimate_cost(tokens)}
+        for summary, tokens in zip(summaries, token_counts)
+    ]
+
+
+def sentiment_analysis_batch(texts, batch_size=32) -> list:
+    """Same results as `sentiment_analysis` per text: short texts share
+    forward passes, long ones go through the chunked path."""
+    sentiment_model = registry.get("sentiment")
+    texts = list(texts)
+    results = [None] * len(texts)
+    counts, budget = _token_counts(sentiment_model, texts)
+    short = [i for i, tokens in enumerate(counts) if tokens <= budget]
+    outputs = run_bucketed(
+        [texts[i] for i in short],
+        lambda batch: sentiment_model(batch, batch_size=len(batch), truncation=True),
+        batch_size,
+        key=len,
+    )
+    for i, output in zip(short, outputs):
+        results[i] = {**output, "chunks": 1, "tokens": counts[i]}
+    for i, text in enumerate(texts):
+        if results[i] is None:
+            results[i] = sentiment_analysis_chunked(text, batch_size=batch_size)
+    return results
+
+
+def analyze_batch(texts, sentiment_batch_size=32, summary_batch_size=8) -> list:
+    """Sentiment and local summary for many texts, using batched forward passes.
+
+    Results come back in the same order as `texts`.
+    """
+    texts = list(texts)
+    sentiments = sentiment_analysis_batch(texts, batch_size=sentiment_batch_size)
+    summaries = summarize_batch_with_mistral(texts, batch_size=summary_batch_size)
+    return [
+        {"text": text, "sentiment": sentiment, "mistral": summary}
+        for text, sentiment, summary in zip(texts, sentiments, summaries)
+    ]
+
+
+from utils.text_stats import text_statistics, text_statistics_file
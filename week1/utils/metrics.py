@@ -0,0 +1,122 @@
+import os, threading, time
+from collections import Counter, defaultdict, deque
+from functools import partial, wraps
+from utils.llm_helpers import is_error
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return 0
+
+
+def percentile(values, q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class PipelineMetrics:
+    """Per-stage latency, token and memory samples for the analysis pipeline.
+
+    Memory is the RSS change across a stage; stages run concurrently, so it is
+    indicative rather than an exact per-stage attribution. Counts, errors and
+    tokens cover every call; latency and memory figures cover the last
+    `max_samples` calls of each stage, so a long-running server keeps a
+    bounded window instead of every sample. Stages the pipeline stopped
+    waiting for are counted as `timed_out`, and as `still_running` until
+    their thread actually finishes.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # stage -> deque of (seconds, rss_delta), most recent last
+            self._samples = defaultdict(partial(deque, maxlen=self.max_samples))
+            self._totals = defaultdict(Counter)  # stage -> count / errors / tokens / timed_out
+            self._running = Counter()  # stage -> timed-out calls not finished yet
+            self._started = time.perf_counter()
+
+    def record(self, stage: str, seconds: float, tokens: int = 0, rss_delta: int = 0, ok: bool = True):
+        with self._lock:
+            self._samples[stage].append((seconds, rss_delta))
+            totals = self._totals[stage]
+            totals["count"] += 1
+            totals["errors"] += not ok
+            totals["tokens"] += tokens
+
+    def record_timeout(self, stage: str, future):
+        """Count a call the caller gave up on; `future` is the still-running call."""
+        with self._lock:
+            self._totals[stage]["timed_out"] += 1
+            self._running[stage] += 1
+            running = self._running
+        future.add_done_callback(lambda _: self._finished(running, stage))
+
+    def _finished(self, running, stage):
+        with self._lock:
+            running[stage] -= 1
+
+    def timed(self, stage: str, fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            rss_before = rss_bytes()
+            start = time.perf_counter()
+            ok = False
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+                ok = not is_error(result)
+                return result
+            finally:
+                tokens = result.get("tokens", 0) if isinstance(result, dict) else 0
+                self.record(stage, time.perf_counter() - start, tokens or 0, rss_bytes() - rss_before, ok)
+        return wrapper
+
+    def summary(self) -> dict:
+        with self._lock:
+            elapsed = time.perf_counter() - self._started
+            snapshot = {stage: (list(self._samples.get(stage, ())), Counter(totals)) for stage, totals in self._totals.items()}
+            running = dict(self._running)
+        report = {}
+        for stage, (samples, totals) in snapshot.items():
+            # no samples yet if every call so far timed out and is still running
+            latencies = sorted(s[0] for s in samples)  # sorted once; percentile() re-sorts in O(n)
+            report[stage] = {
+                "count": totals["count"],
+                "errors": totals["errors"],
+                "timed_out": totals["timed_out"],
+                "still_running": running.get(stage, 0),
+                "mean_s": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+                "p50_s": round(percentile(latencies, 50), 4),
+                "p95_s": round(percentile(latencies, 95), 4),
+                "p99_s": round(percentile(latencies, 99), 4),
+                "throughput_per_s": round(totals["count"] / elapsed, 3) if elapsed else 0.0,
+                "tokens": totals["tokens"],
+                "max_rss_delta_mb": round(max((s[1] for s in samples), default=0) / 1e6, 2),
+            }
+        return report
+
+
+metrics = PipelineMetrics()
@@ -0,0 +1,125 @@
+import threading, time, logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_bytes(obj) -> int:
+    """Rough resident size of a loaded model/pipeline, from its parameters and buffers."""
+    model = getattr(obj, "model", obj)
+    total = 0
+    for attr in ("parameters", "buffers"):
+        tensors = getattr(model, attr, None)
+        if tensors is None:
+            continue
+        try:
+            total += sum(t.numel() * t.element_size() for t in tensors())
+        except Exception:
+            pass
+    return total
+
+
+class ModelRegistry:
+    """Process-wide, lazily populated cache of models and pipelines.
+
+    Loaders are registered by name and only run on first use (or on `warm_up`).
+    Entries are kept in LRU order and evicted once the estimated total size
+    exceeds `max_bytes`. The most recently loaded entry is never evicted, so a
+    single model larger than the budget still works.
+    """
+
+    def __init__(self, max_bytes: int = 0, size_fn=estimate_bytes):
+        self.max_bytes = max_bytes
+        self.size_fn = size_fn
+        self._loaders = {}
+        self._entries = OrderedDict()  # name -> (obj, nbytes)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_times = {}
+
+    def register(self, name: str, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str):
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return self._entries[name][0]
+            if name not in self._loaders:
+                raise KeyError(f"No loader registered for model '{name}'")
+            load_lock = self._load_locks[name]
+
+        # Load outside the registry lock so hits on other models are not blocked,
+        # but serialize loads of the same model so it is only loaded once.
+        with load_lock:
+            with self._lock:
+                if name in self._entries:
+                    self._entries.move_to_end(name)
+                    self.hits += 1
+                    return self._entries[name][0]
+                self.misses += 1
+                loader = self._loaders[name]
+            start = time.perf_counter()
+            obj = loader()
+            elapsed = time.perf_counter() - start
+            nbytes = self.size_fn(obj)
+            logger.info("Loaded model '%s' in %.2fs (~%.1f MB)", name, elapsed, nbytes / 1e6)
+            with self._lock:
+                self.load_times[name] = self.load_times.get(name, 0.0) + elapsed
+                self._entries[name] = (obj, nbytes)
+                self._entries.move_to_end(name)
+                self._evict_over_budget()
+            return obj
+
+    def _evict_over_budget(self):
+        if not self.max_bytes:
+            return
+        while len(self._entries) > 1 and self.current_bytes() > self.max_bytes:
+            name, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            logger.info("Evicted model '%s' from registry", name)
+
+    def current_bytes(self) -> int:
+        return sum(nbytes for _, nbytes in self._entries.values())
+
+    def warm_up(self, names=None):
+        """Eagerly load the given models (all registered ones by default)."""
+        for name in (names if names is not None else list(self._loaders)):
+            name = name.strip()
+            if name:
+                self.get(name)
+
+    def evict(self, name: str) -> bool:
+        with self._lock:
+            return self._entries.pop(name, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def loaded(self):
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "load_time_s": dict(self.load_times),
+                "loaded": list(self._entries),
+                "bytes": self.current_bytes(),
+                "max_bytes": self.max_bytes,
+            }
+
+
+registry = ModelRegistry()
@@ -0,0 +1,151 @@
+import hashlib, json, sqlite3, threading, time, logging
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from utils.llm_helpers import is_error
+from config import (
+    LLAMA_MODEL, MISTRAL_MODEL, SENTIMENT_MODEL, INFERENCE_BACKEND, RESULT_CACHE_ENABLED, RESULT_CACHE_PATH,
+    RESULT_CACHE_TTL, RESULT_CACHE_MEMORY_ITEMS, RESULT_CACHE_MAX_ITEMS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Runtime and weight precision of each local backend (see utils/backends.py).
+BACKEND_IDENTITY = {"torch": "torch-fp32", "int8": "torch-int8-dynamic", "onnx": "onnx-fp32"}
+
+# What makes a stage's output change besides the text. Bump the version
+# suffix when a stage's prompt or post-processing changes. Local stages
+# include the backend, so quantized runs never reuse fp32 results.
+def stage_identity(backend: str) -> dict:
+    local = BACKEND_IDENTITY.get(backend, backend)
+    return {
+        "llama": f"groq:{LLAMA_MODEL}:t0.5:max300:v1",
+        "mistral": f"hf:{MISTRAL_MODEL}:{local}:max200:v1",
+        "sentiment": f"hf:{SENTIMENT_MODEL}:{local}:v3",  # v3: long texts chunked, token counts in every result
+        "stats": "text_stats:top10:v1",
+    }
+
+
+STAGE_IDENTITY = stage_identity(INFERENCE_BACKEND)
+
+
+class ResultCache:
+    """Two-tier (memory LRU + SQLite) cache of per-stage analysis results.
+
+    Keys are the SHA-256 of stage identity + text, so the same text analyzed
+    with a different model or config never collides. Entries expire after
+    `ttl` seconds; the disk tier is trimmed to `max_items` least recently used.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, ttl=RESULT_CACHE_TTL, memory_items=RESULT_CACHE_MEMORY_ITEMS,
+                 max_items=RESULT_CACHE_MAX_ITEMS, identity=None):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.memory_items = memory_items
+        self.max_items = max_items
+        self.identity = identity or STAGE_IDENTITY
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, stage TEXT, value TEXT, expires_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed_at)")
+
+    def key(self, stage: str, text: str) -> str:
+        identity = self.identity.get(stage, stage)
+        return hashlib.sha256(f"{identity}\0{text}".encode("utf-8")).hexdigest()
+
+    def _count(self, stage, outcome):
+        stage_stats = self._stats.setdefault(stage, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        stage_stats[outcome] += 1
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, stage: str, text: str, default=None):
+        key = self.key(stage, text)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self._count(stage, "memory_hits")
+                return entry[1]
+            row = self._db.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] > now:
+                value = json.loads(row[0])
+                self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+                self._remember(key, row[1], value)
+                self._count(stage, "disk_hits")
+                return value
+            if row is not None:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self._count(stage, "misses")
+            return default
+
+    def set(self, stage: str, text: str, value):
+        key = self.key(stage, text)
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, stage, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, stage, json.dumps(value), expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict(now)
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM results").fetchone()
+        if count > self.max_items:
+            self._db.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_items,),
+            )
+
+    def cached(self, stage: str, fn):
+        """Wrap a `fn(text)` stage so successful results are served from the cache."""
+        @wraps(fn)
+        def wrapper(text, *args, **kwargs):
+            result = self.get(stage, text)
+            if result is not None:
+                return result
+            result = fn(text, *args, **kwargs)
+            if not is_error(result):
+                self.set(stage, text, result)
+            return result
+        return wrapper
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = {}
+            for stage, s in self._stats.items():
+                lookups = s["memory_hits"] + s["disk_hits"] + s["misses"]
+                hits = s["memory_hits"] + s["disk_hits"]
+                report[stage] = dict(s, hit_ratio=round(hits / lookups, 3) if lookups else 0.0)
+            return report
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM results")
+
+
+result_cache = ResultCache() if RESULT_CACHE_ENABLED else None
+
+
+def cached_stage(stage: str, fn):
+    return result_cache.cached(stage, fn) if result_cache is not None else fn
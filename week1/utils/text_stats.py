@@ -0,0 +1,155 @@
+import heapq, mmap, os, re, logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from config import OFFLINE
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20  # 1 MiB per tokenization step
+WHITESPACE = b" \t\n\r\f\v"
+
+_word_tokenize = None
+
+
+def _get_word_tokenize():
+    """NLTK's word_tokenize, downloading punkt on first use unless offline.
+
+    Falls back to a simple regex tokenizer when the punkt data is not available.
+    """
+    global _word_tokenize
+    if _word_tokenize is None:
+        try:
+            import nltk
+            from nltk.tokenize import word_tokenize
+            try:
+                word_tokenize("warm up")
+            except LookupError:
+                if OFFLINE:
+                    raise
+                nltk.download("punkt", quiet=True)
+                nltk.download("punkt_tab", quiet=True)
+                word_tokenize("warm up")
+            _word_tokenize = word_tokenize
+        except Exception as e:
+            logger.warning("NLTK punkt unavailable (%s), using regex word tokenizer", e)
+            _word_tokenize = lambda text: re.findall(r"\w+|[^\w\s]", text)
+    return _word_tokenize
+
+
+def top_k(freq: Counter, k: int = 10):
+    return heapq.nlargest(k, freq.items(), key=itemgetter(1))
+
+
+def _summary(freq: Counter, total_words: int, k: int = 10) -> dict:
+    return {
+        "total_words": total_words,
+        "unique_words": len(freq),
+        "most_common": top_k(freq, k),
+    }
+
+
+def _count_chunks(chunks):
+    """Tokenize chunks one at a time so only one chunk's tokens are alive at once."""
+    tokenize = _get_word_tokenize()
+    freq = Counter()
+    total = 0
+    for chunk in chunks:
+        words = tokenize(chunk.lower())
+        total += len(words)
+        freq.update(words)
+    return freq, total
+
+
+def _split_text(text: str, chunk_size: int = CHUNK_SIZE):
+    """Yield pieces of `text` of roughly `chunk_size` chars, cut at whitespace."""
+    start, n = 0, len(text)
+    while start < n:
+        end = min(n, start + chunk_size)
+        if end < n:
+            cut = max(text.rfind(" ", start, end), text.rfind("\n", start, end))
+            if cut > start:
+                end = cut
+        yield text[start:end]
+        start = end
+
+
+def _boundary(buf, pos: int, end: int) -> int:
+    """First whitespace offset at or after `pos` (or `end`), so words are never split."""
+    while pos < end and buf[pos] not in WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _iter_mapped(buf, start: int, end: int, chunk_size: int):
+    while start < end:
+        stop = _boundary(buf, min(end, start + chunk_size), end)
+        # cutting at an ASCII whitespace byte never splits a UTF-8 sequence
+        yield buf[start:stop].decode("utf-8", errors="replace")
+        start = stop
+
+
+def iter_file_chunks(path, chunk_size: int = CHUNK_SIZE):
+    """Stream a text file as whitespace-aligned chunks through mmap."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield from _iter_mapped(buf, 0, len(buf), chunk_size)
+
+
+def _count_file_range(args):
+    path, start, end, chunk_size = args
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return _count_chunks(_iter_mapped(buf, start, end, chunk_size))
+
+
+def _file_ranges(path, parts: int):
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        cuts = [0]
+        for i in range(1, parts):
+            cut = _boundary(buf, max(cuts[-1], size * i // parts), size)
+            if cut > cuts[-1]:
+                cuts.append(cut)
+        cuts.append(size)
+    return [(cuts[i], cuts[i + 1]) for i in range(len(cuts) - 1) if cuts[i + 1] > cuts[i]]
+
+
+def merge_counts(partials):
+    freq = Counter()
+    total = 0
+    for part_freq, part_total in partials:
+        freq.update(part_freq)
+        total += part_total
+    return freq, total
+
+
+def text_statistics(text: str, top_n: int = 10):
+    freq, total = _count_chunks(_split_text(text))
+    return _summary(freq, total, top_n)
+
+
+def text_statistics_file(path, top_n: int = 10, chunk_size: int = CHUNK_SIZE, workers: int = 1):
+    """Word statistics for a (possibly very large) text file.
+
+    With `workers > 1` the file is split into whitespace-aligned byte ranges that
+    are counted in a process pool and the partial counters are merged.
+    """
+    if workers <= 1:
+        freq, total = _count_chunks(iter_file_chunks(path, chunk_size))
+        return _summary(freq, total, top_n)
+    jobs = [(str(path), start, end, chunk_size) for start, end in _file_ranges(path, workers * 4)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        freq, total = merge_counts(pool.map(_count_file_range, jobs))
+    return _summary(freq, total, top_n)
+
+
+def corpus_statistics(paths, top_n: int = 10, chunk_size: int = CHUNK_SIZE, workers: int = None):
+    """Map-reduce word statistics over many files, one file per pool task."""
+    jobs = [(str(p), 0, os.path.getsize(p), chunk_size) for p in paths if os.path.getsize(p)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        freq, total = merge_counts(pool.map(_count_file_range, jobs))
+    return _summary(freq, total, top_n)
@@ -1,9 +1,44 @@
-import matplotlib.pyplot as plt
-from transformers import AutoTokenizer
+import hashlib, json, os, threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from config import OFFLINE
+from utils.model_registry import registry
+from utils.llm_helpers import estimate_cost
 
-# GPT-2 & BERT tokenizers
-gpt_tokenizer = AutoTokenizer.from_pretrained("openai-community/gpt2")
-bert_tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
+GPT_TOKENIZER = "openai-community/gpt2"
+BERT_TOKENIZER = "bert-base-uncased"
+
+
+def _load_tokenizer(name):
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(name, local_files_only=OFFLINE)
+
+
+# GPT-2 & BERT tokenizers, loaded on first use
+registry.register("gpt2_tokenizer", lambda: _load_tokenizer(GPT_TOKENIZER))
+registry.register("bert_tokenizer", lambda: _load_tokenizer(BERT_TOKENIZER))
+
+
+# short name -> registry name, used by the batch helpers below
+TOKENIZERS = {"gpt2": "gpt2_tokenizer", "bert": "bert_tokenizer"}
+
+
+def get_gpt_tokenizer():
+    return registry.get("gpt2_tokenizer")
+
+
+def get_bert_tokenizer():
+    return registry.get("bert_tokenizer")
+
+
+def __getattr__(name):
+    # Keep `tokenizer_helpers.gpt_tokenizer` / `.bert_tokenizer` working without
+    # loading them at import time.
+    if name == "gpt_tokenizer":
+        return get_gpt_tokenizer()
+    if name == "bert_tokenizer":
+        return get_bert_tokenizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def tokenize_text(tokenizer, text: str):
     return tokenizer.tokenize(text)
@@ -11,19 +46,144 @@ def tokenize_text(tokenizer, text: str):
 def count_tokens(tokenizer, text: str):
     return len(tokenizer.encode(text))
 
-def visualize_tokens(tokenizer, text: str, title="Token Distribution"):
+def visualize_tokens(tokenizer, text: str, title="Token Distribution", output_path=None):
+    """Plot token lengths; with `output_path` render headlessly to that file instead of showing.
+
+    Inputs longer than `MAX_BAR_TOKENS` are drawn as a length histogram.
+    """
+    from utils.visualization import MAX_BAR_TOKENS, plot_tokens, plot_distributions
     tokens = tokenizer.tokenize(text)
     lengths = [len(t) for t in tokens]
-    plt.bar(range(len(tokens)), lengths)
-    plt.xticks(range(len(tokens)), tokens, rotation=45)
-    plt.ylabel("Token length (chars)")
+    if output_path is not None:
+        if len(tokens) > MAX_BAR_TOKENS:
+            return plot_distributions({tokenizer.name_or_path: lengths}, title, output_path)
+        return plot_tokens(tokens, lengths, title, output_path)
+    import matplotlib.pyplot as plt
+    if len(tokens) > MAX_BAR_TOKENS:
+        plt.hist(lengths, bins=range(1, max(lengths) + 2))
+        plt.xlabel("Token length (chars)")
+        plt.ylabel("Tokens")
+    else:
+        plt.bar(range(len(tokens)), lengths)
+        plt.xticks(range(len(tokens)), tokens, rotation=45)
+        plt.ylabel("Token length (chars)")
     plt.title(title)
     plt.show()
 
 def compare_tokenization(samples):
-    results = []
-    for s in samples:
-        gpt_tokens = count_tokens(gpt_tokenizer, s)
-        bert_tokens = count_tokens(bert_tokenizer, s)
-        results.append((s, gpt_tokens, bert_tokens))
-    return results
+    samples = list(samples)
+    counts = compare_tokenization_batch(samples)
+    return [(s, int(g), int(b)) for s, g, b in zip(samples, counts["gpt2"], counts["bert"])]
+
+
+class TokenCountCache:
+    """Token counts keyed by (tokenizer, sha1 of text), optionally persisted as JSON.
+
+    With `max_entries` the least recently used counts are evicted once the
+    cache grows past that many entries.
+    """
+
+    def __init__(self, path=None, max_entries: int = 0):
+        self.path = path
+        self.max_entries = max_entries
+        self.counts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.counts.update(json.load(f))
+            self._evict()
+
+    @staticmethod
+    def key(tokenizer_name: str, text: str) -> str:
+        return f"{tokenizer_name}:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+
+    def get(self, key):
+        with self._lock:
+            count = self.counts.get(key)
+            if count is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.counts.move_to_end(key)
+            return count
+
+    def update(self, items):
+        with self._lock:
+            self.counts.update(items)
+            self._evict()
+
+    def _evict(self):
+        while self.max_entries and len(self.counts) > self.max_entries:
+            self.counts.popitem(last=False)
+            self.evictions += 1
+
+    def save(self, path=None):
+        path = path or self.path
+        if path:
+            with self._lock:
+                tmp = f"{path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self.counts, f)
+                os.replace(tmp, path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / lookups if lookups else 0.0, "size": len(self.counts), "evictions": self.evictions}
+
+
+def _encode_lengths(name: str, texts, batch_size: int):
+    # Same count as `count_tokens` (special tokens included), but one
+    # batched call into the fast (Rust) tokenizer per `batch_size` texts.
+    tokenizer = registry.get(TOKENIZERS[name])
+    lengths = []
+    for i in range(0, len(texts), batch_size):
+        lengths.extend(len(ids) for ids in tokenizer(texts[i:i + batch_size])["input_ids"])
+    return lengths
+
+
+def _encode_lengths_job(args):
+    return _encode_lengths(*args)
+
+
+def count_tokens_batch(name: str, texts, batch_size: int = 1000, cache: TokenCountCache = None, workers: int = 1):
+    """Token counts for many texts as a NumPy int array, in input order."""
+    import numpy as np
+    texts = list(texts)
+    counts = np.zeros(len(texts), dtype=np.int64)
+    todo = list(range(len(texts)))
+    keys = None
+    if cache is not None:
+        keys = [cache.key(name, t) for t in texts]
+        todo = []
+        for i, k in enumerate(keys):
+            cached = cache.get(k)
+            if cached is None:
+                todo.append(i)
+            else:
+                counts[i] = cached
+    missing = [texts[i] for i in todo]
+    if workers > 1 and len(missing) > batch_size:
+        step = -(-len(missing) // workers)
+        jobs = [(name, missing[i:i + step], batch_size) for i in range(0, len(missing), step)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            lengths = [n for part in pool.map(_encode_lengths_job, jobs) for n in part]
+    else:
+        lengths = _encode_lengths(name, missing, batch_size) if missing else []
+    counts[todo] = lengths
+    if cache is not None and todo:
+        cache.update({keys[i]: n for i, n in zip(todo, lengths)})
+    return counts
+
+
+def compare_tokenization_batch(samples, tokenizers=("gpt2", "bert"), batch_size: int = 1000, cache: TokenCountCache = None, workers: int = 1):
+    """Columnar version of `compare_tokenization`: {tokenizer name: counts array}."""
+    samples = list(samples)
+    return {name: count_tokens_batch(name, samples, batch_size, cache, workers) for name in tokenizers}
+
+
+def estimate_cost_batch(samples, price_per_1k=0.0, tokenizer="gpt2", cache: TokenCountCache = None) -> float:
+    counts = count_tokens_batch(tokenizer, samples, cache=cache)
+    return estimate_cost(int(counts.sum()), price_per_1k)
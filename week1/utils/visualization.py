@@ -0,0 +1,116 @@
+import re, multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from config import RESULTS_DIR
+from utils.model_registry import registry
+from utils.tokenizer_helpers import TOKENIZERS
+
+# Above this many tokens a per-token bar chart is unreadable, so we switch
+# to a histogram of token lengths.
+MAX_BAR_TOKENS = 60
+
+
+def _figure(width=8, height=4):
+    # The object-oriented API with the Agg canvas never touches pyplot's global
+    # state or a display, so it works on servers. Matplotlib is still not
+    # thread-safe (font and text caches are shared), so render in one thread
+    # per process.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=(width, height))
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def token_lengths(name: str, texts, batch_size: int = 256):
+    """Per-document NumPy arrays of token lengths (chars), via batched offset mapping."""
+    import numpy as np
+    tokenizer = registry.get(TOKENIZERS[name])
+    texts = list(texts)
+    lengths = []
+    for i in range(0, len(texts), batch_size):
+        enc = tokenizer(texts[i:i + batch_size], add_special_tokens=False, return_offsets_mapping=True)
+        for offsets in enc["offset_mapping"]:
+            spans = np.asarray(offsets, dtype=np.int32).reshape(-1, 2)
+            lengths.append(spans[:, 1] - spans[:, 0])
+    return lengths
+
+
+def length_histogram(lengths, max_len: int = 20):
+    """Counts of token lengths 1..max_len (longer tokens go in the last bin)."""
+    import numpy as np
+    lengths = np.clip(np.asarray(lengths, dtype=np.int64), 0, max_len)
+    return np.bincount(lengths, minlength=max_len + 1)[1:]
+
+
+def plot_tokens(tokens, lengths, title, path):
+    fig = _figure(max(8, len(tokens) * 0.25), 4)
+    ax = fig.add_subplot()
+    ax.bar(range(len(tokens)), lengths)
+    ax.set_xticks(range(len(tokens)))
+    ax.set_xticklabels(tokens, rotation=45, ha="right", fontsize=8)
+    ax.set_ylabel("Token length (chars)")
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
+    return path
+
+
+def plot_distributions(lengths_by_tokenizer: dict, title, path, max_len: int = 20):
+    import numpy as np
+    fig = _figure()
+    ax = fig.add_subplot()
+    names = list(lengths_by_tokenizer)
+    width = 0.8 / max(1, len(names))
+    x = np.arange(1, max_len + 1)
+    for i, name in enumerate(names):
+        lengths = lengths_by_tokenizer[name]
+        hist = length_histogram(lengths, max_len)
+        ax.bar(x + i * width, hist, width=width, label=f"{name} ({len(lengths)} tokens, mean {np.mean(lengths) if len(lengths) else 0:.2f})")
+    ax.set_xlabel(f"Token length (chars, last bin = {max_len}+)")
+    ax.set_ylabel("Tokens")
+    ax.set_title(title)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
+    return path
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", text).strip("_")[:60] or "doc"
+
+
+def _render_job(args):
+    return plot_distributions(*args)
+
+
+def render_token_distributions(docs, tokenizers=("gpt2", "bert"), outdir=RESULTS_DIR, names=None, workers: int = 4):
+    """Render one token-length distribution image per document, headlessly.
+
+    Tokenization is batched per tokenizer across all documents, and with
+    `workers > 1` the figures are drawn in a process pool. Each file name ends
+    in the document's index, so names that slug to the same text don't
+    overwrite each other. Returns the written image paths.
+    """
+    docs = list(docs)
+    names = list(names) if names is not None else [f"doc_{i:04d}" for i in range(len(docs))]
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    lengths = {name: token_lengths(name, docs) for name in tokenizers}
+
+    jobs = [
+        ({t: lengths[t][i] for t in tokenizers}, names[i], outdir / f"tokens_{_slug(names[i])}_{i:04d}.png")
+        for i in range(len(docs))
+    ]
+    if workers <= 1 or len(jobs) <= 1:
+        return [_render_job(job) for job in jobs]
+    # spawn, not fork: the fast tokenizers above have started threads in this process
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(_render_job, jobs))
+
+
+def render_sample_texts(sample_dir, **kwargs):
+    """Batch job over a directory of .txt files (e.g. data/sample_texts)."""
+    paths = sorted(Path(sample_dir).glob("*.txt"))
+    docs = [p.read_text(encoding="utf-8", errors="replace") for p in paths]
+    return render_token_distributions(docs, names=[p.stem for p in paths], **kwargs)
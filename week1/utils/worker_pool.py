@@ -0,0 +1,177 @@
+import gc, os, itertools, logging, multiprocessing, threading
+from concurrent.futures import Future
+from utils.model_registry import registry
+
+logger = logging.getLogger(__name__)
+
+def _init_worker(threads: int):
+    # One process per core already gives parallelism; more torch threads per
+    # worker would just oversubscribe the CPU.
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _call(name, args, kwargs):
+    from utils import llm_helpers
+    return getattr(llm_helpers, name)(*args, **kwargs)
+
+
+def _serve(tasks, results, threads: int):
+    _init_worker(threads)
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        call_id, name, args, kwargs = task
+        try:
+            results.put((call_id, True, _call(name, args, kwargs)))
+        except Exception as e:
+            results.put((call_id, False, e))
+
+
+def _share(obj):
+    model = getattr(obj, "model", None)
+    if hasattr(model, "share_memory"):
+        try:
+            model.share_memory()
+        except Exception as e:  # e.g. some quantized modules
+            logger.info("Could not move %s to shared memory: %s", type(model).__name__, e)
+
+
+def process_memory(pid: int) -> dict:
+    """RSS / PSS and shared vs private bytes of a process (Linux only, else {})."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[1].isdigit():
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        return {}
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {"rss": fields.get("Rss", 0), "pss": fields.get("Pss", 0), "shared": shared, "private": private}
+
+
+class PreforkPool:
+    """Worker processes forked from a parent that already holds the models.
+
+    The parent loads the models once, moves their tensors to shared memory and
+    freezes the GC (so collections in the workers don't write to, and copy, the
+    inherited object pages), then forks the workers. Each worker serves calls
+    to `utils.llm_helpers` functions with the inherited, read-only models, so
+    adding a worker costs its private memory only, not another model copy.
+    Create the pool before starting any threads in the parent.
+
+    The workers are forked once, here, and never re-forked: by the time one
+    dies (e.g. OOM-killed) the parent is running threads, and forking it then
+    is unsafe. A dead worker is therefore not replaced and the call it was
+    running never returns, so callers should always pass a `timeout`; a
+    timed-out call reports which workers died meanwhile, and once all of them
+    are gone `call` raises RuntimeError.
+    """
+
+    def __init__(self, workers: int, models=("summarizer", "sentiment"), threads_per_worker: int = 1):
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        registry.warm_up(models)
+        for name in registry.loaded():
+            _share(registry.get(name))
+        gc.collect()
+        gc.freeze()
+        ctx = multiprocessing.get_context("fork")
+        self.workers = workers
+        self._tasks = ctx.SimpleQueue()
+        self._results = ctx.SimpleQueue()
+        self._procs = [ctx.Process(target=_serve, args=(self._tasks, self._results, threads_per_worker),
+                                   name=f"ModelWorker-{i}", daemon=True) for i in range(workers)]
+        for p in self._procs:
+            p.start()
+        # Only start threads once every worker has been forked.
+        self._lock = threading.Lock()
+        self._pending = {}  # call id -> Future
+        self._ids = itertools.count()
+        self._collector = threading.Thread(target=self._collect, name="model-worker-results", daemon=True)
+        self._collector.start()
+        self._pids = self._worker_pids()
+        self.timed_out = 0
+        self.died = 0
+        logger.info("Started %d model workers sharing %s", workers, registry.loaded())
+
+    def call(self, name: str, *args, timeout: float = None, **kwargs):
+        """Run `llm_helpers.<name>(*args, **kwargs)` on the next free worker.
+
+        Raises TimeoutError when no result arrives within `timeout` seconds,
+        and RuntimeError when no workers are left.
+        """
+        self._check_workers()
+        if not self._pids:
+            raise RuntimeError(f"{name}: all {self.workers} model workers have died")
+        future = Future()
+        with self._lock:
+            call_id = next(self._ids)
+            self._pending[call_id] = future
+        self._tasks.put((call_id, name, args, kwargs))
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            with self._lock:
+                self._pending.pop(call_id, None)
+                self.timed_out += 1
+            died = self._check_workers()
+            reason = f"; model workers {sorted(died)} died and were not replaced" if died else ""
+            raise TimeoutError(f"{name} got no result within {timeout:.0f}s{reason}") from None
+
+    def _collect(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            call_id, ok, value = item
+            with self._lock:
+                future = self._pending.pop(call_id, None)
+            if future is None:  # the caller already timed out
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _worker_pids(self) -> set:
+        return {p.pid for p in self._procs if p.is_alive()}
+
+    def _check_workers(self) -> set:
+        """Pids of workers that exited since the last check; they are not replaced."""
+        with self._lock:
+            current = self._worker_pids()
+            died = self._pids - current
+            self._pids = current
+            if died:
+                self.died += len(died)
+                logger.warning("Model workers %s died; calls they were running are lost, %d left",
+                               sorted(died), len(current))
+            return died
+
+    def stats(self) -> dict:
+        self._check_workers()
+        return {**self.memory(), "alive": len(self._pids), "timed_out": self.timed_out, "died": self.died}
+
+    def memory(self) -> dict:
+        children = [p for p in self._procs if p.is_alive()]
+        parent = process_memory(os.getpid())
+        per_worker = {p.pid: process_memory(p.pid) for p in children}
+        # PSS splits shared pages between the processes using them, so the sum
+        # is the real total footprint (summing RSS would count models N times).
+        total_pss = parent.get("pss", 0) + sum(m.get("pss", 0) for m in per_worker.values())
+        return {"parent": parent, "workers": per_worker, "total_pss_mb": round(total_pss / 1e6, 1)}
+
+    def close(self):
+        for _ in self._worker_pids():
+            self._tasks.put(None)
+        for p in self._procs:
+            p.join()
+        self._results.put(None)
+        self._collector.join()
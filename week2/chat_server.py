@@ -0,0 +1,218 @@
+"""Asyncio chat service hosting many chatbot conversations in one process.
+
+Every session has its own system prompt and history, and all sessions share
+one pooled async Groq client. A global semaphore caps in-flight LLM calls and
+each session accepts only a few queued messages (backpressure), so one chatty
+client can't starve the rest.
+
+Run it as a line-based TCP server (one connection = one session):
+
+    python chat_server.py --port 8800
+    # then e.g. `nc 127.0.0.1 8800`; "/system 2" switches persona
+"""
+import argparse
+import asyncio
+import collections
+import os
+import time
+import uuid
+
+from groq import AsyncGroq, Groq
+from memory import ConversationMemory, make_groq_summarizer
+from semantic_cache import SemanticCache
+from task2 import api_key, get_system_prompt_presets
+
+
+class SessionBusy(Exception):
+    """Raised when a session already has `max_pending` messages waiting."""
+
+
+class AsyncChatBot:
+    """One conversation answered through a shared AsyncGroq client.
+
+    Keeps the same state as SimpleChatBot (system prompt, token-budgeted
+    memory with a rolling summary, optional semantic cache) but answers with
+    `await aget_response(...)`. The summarizer and cache calls block, so they
+    run off the event loop (memory folds on its own thread).
+    """
+
+    def __init__(self, client: AsyncGroq, system_prompt: str, max_tokens: int = 2000, cache: SemanticCache = None,
+                 summarizer=None):
+        self.client = client
+        self.cache = cache
+        self.system_prompt = system_prompt
+        self.memory = ConversationMemory(max_tokens=max_tokens, summarizer=summarizer)
+
+    async def aget_response(self, user_input: str) -> str:
+        context = self.memory.context_key()
+        if self.cache is not None:
+            answer, _ = await asyncio.to_thread(self.cache.lookup, self.system_prompt, user_input, context)
+            if answer is not None:
+                self.memory.add("user", user_input)
+                self.memory.add("assistant", answer)
+                return answer
+        messages = self.memory.build_messages(self.system_prompt, user_input)
+        start = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model="llama3-8b-8192",
+            messages=messages,
+            max_tokens=200,
+            temperature=0.7,
+        )
+        ai_response = response.choices[0].message.content
+        self.memory.add("user", user_input)
+        self.memory.add("assistant", ai_response)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.store, self.system_prompt, user_input, ai_response, time.perf_counter() - start, context)
+        return ai_response
+
+
+class ChatSession:
+    def __init__(self, session_id: str, bot: AsyncChatBot, max_pending: int):
+        self.id = session_id
+        self.bot = bot
+        self.max_pending = max_pending
+        self.pending = 0
+        self.lock = asyncio.Lock()  # one turn at a time keeps the history ordered
+
+
+class ChatService:
+    def __init__(self, base_url: str = None, max_concurrency: int = 32, max_pending: int = 2,
+                 max_connections: int = 64, timeout: float = 60.0, cache: SemanticCache = None):
+        import httpx
+        key = api_key or os.getenv("GROQ_API_KEY", "missing")
+        base_url = base_url or os.getenv("GROQ_BASE_URL") or None
+        self.client = AsyncGroq(
+            api_key=key,
+            base_url=base_url,
+            timeout=timeout,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=timeout,
+            ),
+        )
+        # summaries are written on memory's background threads, with a blocking client
+        self.summary_client = Groq(api_key=key, base_url=base_url, timeout=timeout)
+        self.summarizer = make_groq_summarizer(self.summary_client)
+        self.presets = get_system_prompt_presets()
+        # shared by all sessions; answers are still scoped per system prompt
+        self.cache = cache
+        self.sessions = {}
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latencies = collections.deque(maxlen=10000)  # most recent turns only
+
+    def create_session(self, session_id: str = None, preset: str = "1") -> str:
+        session_id = session_id or uuid.uuid4().hex
+        _, prompt = self.presets[preset]
+        self.sessions[session_id] = ChatSession(session_id, AsyncChatBot(self.client, prompt, cache=self.cache, summarizer=self.summarizer), self.max_pending)
+        return session_id
+
+    def set_preset(self, session_id: str, preset: str):
+        _, prompt = self.presets[preset]
+        bot = self.sessions[session_id].bot
+        bot.system_prompt = prompt
+        bot.memory.clear()
+
+    def close_session(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    async def chat(self, session_id: str, text: str) -> str:
+        session = self.sessions[session_id]
+        if session.pending >= session.max_pending:
+            self.rejected += 1
+            raise SessionBusy(f"session {session_id} has {session.pending} messages waiting")
+        session.pending += 1
+        start = time.perf_counter()
+        try:
+            async with session.lock:
+                async with self._slots:
+                    reply = await session.bot.aget_response(text)
+            self.completed += 1
+            self.latencies.append(time.perf_counter() - start)
+            return reply
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            session.pending -= 1
+
+    def stats(self) -> dict:
+        ordered = sorted(self.latencies)  # bounded by the deque's maxlen
+
+        def pct(q):
+            return round(ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))], 4) if ordered else 0.0
+
+        return {
+            "sessions": len(self.sessions),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "p50_s": pct(50),
+            "p95_s": pct(95),
+            "p99_s": pct(99),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def close(self):
+        await self.client.close()
+        self.summary_client.close()
+
+
+async def handle_connection(service: ChatService, reader, writer):
+    session_id = service.create_session()
+    writer.write(f"🤖 Session {session_id[:8]} ready. '/system <n>' to switch persona, 'exit' to quit.\n".encode())
+    await writer.drain()
+    try:
+        while line := await reader.readline():
+            text = line.decode("utf-8", errors="replace").strip()
+            if not text:
+                continue
+            if text == "exit":
+                break
+            if text.startswith("/system"):
+                choice = text.split(maxsplit=1)[-1]
+                if choice in service.presets:
+                    service.set_preset(session_id, choice)
+                    reply = f"System Prompt Updated to: {service.presets[choice][0]}!"
+                else:
+                    reply = "❌ Invalid choice. " + ", ".join(f"{k}: {n}" for k, (n, _) in service.presets.items())
+            else:
+                try:
+                    reply = await service.chat(session_id, text)
+                except SessionBusy:
+                    reply = "⏳ Still answering your previous message."
+                except Exception as e:
+                    reply = f"❌ Error: {str(e)}"
+            writer.write(f"{reply}\n".encode("utf-8"))
+            await writer.drain()
+    finally:
+        service.close_session(session_id)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass  # the client already hung up
+
+
+async def serve(host: str, port: int, **service_kwargs):
+    service = ChatService(**service_kwargs)
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    print(f"💬 Chat server listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--max-concurrency", type=int, default=32, help="LLM calls in flight across all sessions")
+    parser.add_argument("--max-pending", type=int, default=2, help="queued messages allowed per session")
+    parser.add_argument("--no-cache", action="store_true", help="disable the semantic response cache")
+    args = parser.parse_args()
+    cache = None if args.no_cache else SemanticCache()
+    asyncio.run(serve(args.host, args.port, max_concurrency=args.max_concurrency, max_pending=args.max_pending, cache=cache))
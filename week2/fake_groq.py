@@ -0,0 +1,70 @@
+"""Local fake of Groq's chat-completions endpoint for tests and load tests.
+
+    python fake_groq.py --port 8766 --latency 0.3
+    GROQ_BASE_URL=http://127.0.0.1:8766 python chat_server.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.server.latency + random.uniform(0, self.server.jitter))
+        with self.server.lock:
+            self.server.requests += 1
+            n = self.server.requests
+        question = payload.get("messages", [{}])[-1].get("content", "")
+        reply = f"Reply {n} to: {question[:80]}"
+        body = json.dumps({
+            "id": f"fake-{n}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(question) // 4, "completion_tokens": len(reply) // 4,
+                      "total_tokens": (len(question) + len(reply)) // 4},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # many sessions connect at once during load tests
+
+
+def start_fake_groq(host="127.0.0.1", port=0, latency=0.2, jitter=0.05):
+    """Run the fake server in a daemon thread; returns (server, base_url for the Groq client)."""
+    server = FakeGroqServer((host, port), FakeGroqHandler)
+    server.latency, server.jitter = latency, jitter
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    server, url = start_fake_groq(port=args.port, latency=args.latency)
+    print(f"Fake Groq running at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
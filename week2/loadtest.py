@@ -0,0 +1,50 @@
+"""Load test for chat_server.ChatService against the local fake Groq server.
+
+    python loadtest.py --sessions 200 --turns 5 --latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fake_groq import start_fake_groq
+from chat_server import ChatService, SessionBusy
+
+
+async def run_session(service: ChatService, turns: int, preset: str):
+    session_id = service.create_session(preset=preset)
+    for turn in range(turns):
+        while True:
+            try:
+                await service.chat(session_id, f"Question {turn}: what is the capital of France?")
+                break
+            except SessionBusy:
+                await asyncio.sleep(0.01)
+    service.close_session(session_id)
+
+
+async def main(args):
+    _, base_url = start_fake_groq(latency=args.latency, jitter=args.latency / 4)
+    service = ChatService(base_url=base_url, max_concurrency=args.max_concurrency)
+    presets = list(service.presets)
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(service, args.turns, presets[i % len(presets)]) for i in range(args.sessions)))
+    wall = time.perf_counter() - start
+    await service.close()
+    report = service.stats()
+    report.update({
+        "wall_s": round(wall, 3),
+        "sessions_per_s": round(args.sessions / wall, 2),
+        "messages_per_s": round(report["completed"] / wall, 2),
+    })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency (s)")
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args))
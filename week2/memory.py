@@ -0,0 +1,188 @@
+import hashlib
+import logging
+import math
+import threading
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional
+    _encoding = None
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead of the chat format (role, separators).
+MESSAGE_OVERHEAD = 4
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else the ~4 chars/token rule of thumb."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an AI assistant. "
+    "Update the summary with the new messages. Keep names, facts, decisions, open questions "
+    "and user preferences; drop small talk. Reply with the updated summary only, at most {words} words."
+)
+
+
+def make_groq_summarizer(client, model="llama3-8b-8192", max_tokens=300):
+    """Summarizer callable for ConversationMemory that uses a Groq client."""
+    def summarize(summary: str, messages: list) -> str:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT.format(words=int(max_tokens * 0.7))},
+                {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"},
+            ],
+            temperature=0.2,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content.strip()
+    return summarize
+
+
+class ConversationMemory:
+    """Chat history kept under a token budget, with a rolling summary of older turns.
+
+    Every message stores its token count once, so the budget check is a sum of
+    cached numbers. When the history grows past `max_tokens`, the oldest
+    messages are folded into `summary` (one summarizer call per fold, which
+    brings the history down to `fold_to` of the budget so folds are rare).
+    The summarizer runs on a background thread, so `add` never waits for an
+    LLM call: the messages being folded stay in the history until the new
+    summary replaces them. Without a summarizer the oldest messages are
+    simply dropped.
+    """
+
+    def __init__(self, max_tokens: int = 1500, summarizer=None, fold_to: float = 0.6, keep_last: int = 2):
+        self.max_tokens = max_tokens
+        self.summarizer = summarizer
+        self.fold_to = fold_to
+        self.keep_last = keep_last
+        self.messages = []
+        self.summary = ""
+        self.summary_tokens = 0
+        self.history_tokens = 0
+        self.folds = 0
+        self._lock = threading.RLock()
+        self._folding = None  # thread writing the next summary
+        self._generation = 0  # bumped by clear(), so a fold started before it is discarded
+
+    def add(self, role: str, content: str):
+        tokens = count_tokens(content) + MESSAGE_OVERHEAD
+        with self._lock:
+            self.messages.append({"role": role, "content": content, "tokens": tokens})
+            self.history_tokens += tokens
+            if self._folding is None and self.history_tokens + self.summary_tokens > self.max_tokens:
+                self._fold()
+
+    def _fold(self):
+        target = self.max_tokens * self.fold_to
+        count, remaining = 0, self.history_tokens
+        while len(self.messages) - count > self.keep_last and remaining + self.summary_tokens > target:
+            remaining -= self.messages[count]["tokens"]
+            count += 1
+        if not count:
+            return
+        if self.summarizer is None:
+            del self.messages[:count]
+            self.history_tokens = remaining
+            return
+        folded = [{"role": m["role"], "content": m["content"]} for m in self.messages[:count]]
+        self._folding = threading.Thread(
+            target=self._summarize, args=(self.summary, folded, self._generation), name="memory-fold", daemon=True,
+        )
+        self._folding.start()
+
+    def _summarize(self, summary: str, folded: list, generation: int):
+        try:
+            summary = self.summarizer(summary, folded)
+        except Exception as e:
+            # keep the previous summary; the folded turns are lost but the chat goes on
+            logger.warning("Summary update failed: %s", e)
+            summary = None
+        with self._lock:
+            if self._folding is threading.current_thread():
+                self._folding = None
+            if generation != self._generation:
+                return
+            for message in self.messages[:len(folded)]:
+                self.history_tokens -= message["tokens"]
+            del self.messages[:len(folded)]
+            if summary is not None:
+                self.summary = summary
+                self.summary_tokens = count_tokens(summary) + MESSAGE_OVERHEAD
+                self.folds += 1
+            if self._folding is None and self.history_tokens + self.summary_tokens > self.max_tokens:
+                self._fold()
+
+    def wait(self, timeout: float = None):
+        """Block until a summary being written in the background is done."""
+        folding = self._folding
+        if folding is not None:
+            folding.join(timeout)
+
+    def restore(self, summary: str, messages: list):
+        """Load a saved summary and the most recent `messages` without calling the summarizer.
+
+        Messages that don't fit the budget next to the summary are left out,
+        oldest first (they are covered by the summary, or lost as without one).
+        """
+        summary_tokens = count_tokens(summary) + MESSAGE_OVERHEAD if summary else 0
+        kept, tokens = [], 0
+        for m in reversed(messages):
+            cost = count_tokens(m["content"]) + MESSAGE_OVERHEAD
+            if kept and summary_tokens + tokens + cost > self.max_tokens:
+                break
+            kept.append({"role": m["role"], "content": m["content"], "tokens": cost})
+            tokens += cost
+        with self._lock:
+            self.clear()
+            self.summary = summary or ""
+            self.summary_tokens = summary_tokens
+            self.messages = kept[::-1]
+            self.history_tokens = tokens
+
+    def build_messages(self, system_prompt: str, user_input: str = None) -> list:
+        """Messages for the API: system prompt, running summary, recent history, new input."""
+        messages = [{"role": "system", "content": system_prompt}]
+        with self._lock:
+            if self.summary:
+                messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+            messages.extend({"role": m["role"], "content": m["content"]} for m in self.messages)
+        if user_input is not None:
+            messages.append({"role": "user", "content": user_input})
+        return messages
+
+    def context_key(self) -> str:
+        """Hash of the last exchange ("" before the first one).
+
+        Follow-ups like "tell me more" depend mostly on the previous turn, so
+        this is what answers are cached under; unlike a hash of the whole
+        history it is the same for every conversation that just had that
+        exchange.
+        """
+        last = self.messages[-2:]
+        if not last:
+            return ""
+        h = hashlib.sha1()
+        for m in last:
+            h.update(f"\0{m['role']}\0{m['content']}".encode("utf-8"))
+        return h.hexdigest()
+
+    def prompt_tokens(self, system_prompt: str = "") -> int:
+        return count_tokens(system_prompt) + MESSAGE_OVERHEAD + self.summary_tokens + self.history_tokens
+
+    def clear(self):
+        with self._lock:
+            self.messages = []
+            self.summary = ""
+            self.summary_tokens = 0
+            self.history_tokens = 0
+            self._folding = None
+            self._generation += 1
@@ -0,0 +1,210 @@
+import hashlib
+import re
+import threading
+import time
+
+import numpy as np
+
+
+class HashingEmbedder:
+    """Dependency-free fallback: hashed word + character-trigram counts, L2-normalized.
+
+    Good at catching near-identical questions (typos, punctuation, word order);
+    install sentence-transformers for real paraphrase matching.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _features(self, text: str):
+        text = re.sub(r"[^\w\s]", " ", text.lower())
+        words = text.split()
+        grams = [f" {w} " for w in words]
+        for w in words:
+            padded = f"#{w}#"
+            grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    def encode(self, texts) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for gram in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+                out[row, h % self.dim] += 1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+def default_embedder():
+    """A small local sentence-transformers model when installed, else HashingEmbedder."""
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+
+        class _STEmbedder:
+            def encode(self, texts):
+                return model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+        return _STEmbedder()
+    except Exception:
+        return HashingEmbedder()
+
+
+class _Scope:
+    """Embeddings and answers cached for one system prompt and context.
+
+    The matrix starts small and doubles as entries are added, so the many
+    scopes of a chat server with a few entries each stay small.
+    """
+
+    def __init__(self, dim: int, capacity: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.questions = []
+        self.answers = []
+        self.created = []
+        self.last_hit = []
+        self.hits = []
+
+    def __len__(self):
+        return len(self.answers)
+
+    def add(self, vector, question, answer, now):
+        n = len(self)
+        if n == len(self.vectors):
+            self.vectors = np.vstack([self.vectors, np.zeros_like(self.vectors)])
+        self.vectors[n] = vector
+        self.questions.append(question)
+        self.answers.append(answer)
+        self.created.append(now)
+        self.last_hit.append(now)
+        self.hits.append(0)
+
+    def remove(self, i):
+        # swap-with-last keeps the matrix dense without shifting rows
+        last = len(self) - 1
+        if i != last:
+            self.vectors[i] = self.vectors[last]
+            for column in (self.questions, self.answers, self.created, self.last_hit, self.hits):
+                column[i] = column[last]
+        for column in (self.questions, self.answers, self.created, self.last_hit, self.hits):
+            column.pop()
+
+
+class SemanticCache:
+    """Answer repeated questions from a cache of past replies.
+
+    Entries are scoped by system prompt and conversation `context` (e.g.
+    `ConversationMemory.context_key()`, the last exchange), so "tell me more"
+    is only answered from a conversation that just had the same exchange.
+    Queries are embedded once and compared with one matrix-vector product
+    against every cached question of the same scope; the best match above
+    `threshold` (cosine similarity) is returned. `max_entries` bounds all
+    scopes together: when it is reached, one entry is evicted by `policy`:
+    "lru" (least recently hit), "lfu" (fewest hits) or "fifo" (oldest).
+    Entries older than `ttl` seconds are dropped before a scope is searched,
+    and empty scopes are dropped.
+    """
+
+    POLICIES = ("lru", "lfu", "fifo")
+
+    def __init__(self, embedder=None, threshold: float = 0.92, max_entries: int = 1000, policy: str = "lru", ttl: float = None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}")
+        self.embedder = embedder or default_embedder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.policy = policy
+        self.ttl = ttl
+        self._scopes = {}
+        self._entries = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.lookup_time = 0.0
+        self.miss_latency = 0.0
+        self.misses_timed = 0
+
+    @staticmethod
+    def _scope_key(system_prompt: str, context: str) -> str:
+        return hashlib.sha1(f"{system_prompt}\0{context}".encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str) -> np.ndarray:
+        return self.embedder.encode([text])[0]
+
+    def lookup(self, system_prompt: str, question: str, context: str = ""):
+        """Return (answer, similarity) for the closest cached question, or (None, best similarity)."""
+        start = time.perf_counter()
+        vector = self._embed(question)
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            key = self._scope_key(system_prompt, context)
+            scope = self._scopes.get(key)
+            answer, best = None, 0.0
+            if scope is not None and self.ttl is not None:
+                # descending, so swap-with-last never moves an unchecked entry
+                for i in reversed(range(len(scope))):
+                    if now - scope.created[i] > self.ttl:
+                        self._remove(key, scope, i)
+                scope = self._scopes.get(key)
+            if scope is not None:
+                sims = scope.vectors[:len(scope)] @ vector
+                i = int(np.argmax(sims))
+                best = float(sims[i])
+                if best >= self.threshold:
+                    scope.hits[i] += 1
+                    scope.last_hit[i] = now
+                    answer = scope.answers[i]
+                    self.hits += 1
+            self.lookup_time += time.perf_counter() - start
+        return answer, best
+
+    def store(self, system_prompt: str, question: str, answer: str, latency: float = None, context: str = ""):
+        """Cache an answer; `latency` (s) of the LLM call feeds the savings estimate."""
+        vector = self._embed(question)
+        with self._lock:
+            if latency is not None:
+                self.miss_latency += latency
+                self.misses_timed += 1
+            if self._entries >= self.max_entries:
+                self._remove(*self._victim())
+            key = self._scope_key(system_prompt, context)
+            scope = self._scopes.get(key)
+            if scope is None:
+                scope = self._scopes[key] = _Scope(len(vector), capacity=4)
+            scope.add(vector, question, answer, time.time())
+            self._entries += 1
+
+    def _remove(self, key: str, scope: _Scope, i: int):
+        scope.remove(i)
+        self._entries -= 1
+        if not len(scope):
+            del self._scopes[key]
+
+    def _victim(self):
+        """(key, scope, index) of the entry `policy` evicts first, across all scopes."""
+        column = {"lfu": "hits", "fifo": "created"}.get(self.policy, "last_hit")
+        return min(
+            ((key, scope, i) for key, scope in self._scopes.items() for i in range(len(scope))),
+            key=lambda entry: getattr(entry[1], column)[entry[2]],
+        )
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
+            self._entries = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg_miss = self.miss_latency / self.misses_timed if self.misses_timed else 0.0
+            avg_lookup = self.lookup_time / self.lookups if self.lookups else 0.0
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+                "entries": self._entries,
+                "scopes": len(self._scopes),
+                "avg_lookup_ms": round(avg_lookup * 1000, 3),
+                "avg_llm_latency_s": round(avg_miss, 3),
+                "est_time_saved_s": round(self.hits * max(0.0, avg_miss - avg_lookup), 2),
+            }
@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+SESSIONS_DIR = Path(os.getenv("CHAT_SESSIONS_DIR", Path(__file__).resolve().parent / "sessions"))
+
+_OFFSET = struct.Struct("<Q")  # one little-endian uint64 per message in the .idx file
+
+
+def _safe_name(name: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name.strip()).strip("._")
+    if not name:
+        raise ValueError("Session name must contain letters or digits")
+    return name
+
+
+class SessionStore:
+    """Append-only, per-session JSONL chat store.
+
+    Each session is `<name>.jsonl` (one message per line) plus `<name>.idx`,
+    the byte offset of every line. Appending writes one line and one offset,
+    so write cost doesn't depend on session length; any page of messages is
+    read with a seek through the index instead of parsing the whole file.
+    Small per-session metadata (system prompt, created time) lives in
+    `<name>.meta.json`; sessions created with an `owner` are also listed in
+    `<owner>.owner`, so one owner's sessions are found without scanning
+    everyone's. Append handles are kept open for the `max_open` most
+    recently written sessions only.
+    """
+
+    def __init__(self, root=SESSIONS_DIR, fsync: bool = False, max_open: int = 32):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._handles = OrderedDict()  # name -> (data, idx), least recently written first
+
+    def _paths(self, name):
+        name = _safe_name(name)
+        return self.root / f"{name}.jsonl", self.root / f"{name}.idx", self.root / f"{name}.meta.json"
+
+    def _open(self, name):
+        name = _safe_name(name)
+        handles = self._handles.get(name)
+        if handles is None:
+            data_path, idx_path, _ = self._paths(name)
+            handles = (open(data_path, "ab"), open(idx_path, "ab"))
+            self._handles[name] = handles
+            while len(self._handles) > self.max_open:
+                for handle in self._handles.popitem(last=False)[1]:
+                    handle.close()
+        else:
+            self._handles.move_to_end(name)
+        return handles
+
+    def append(self, name: str, message: dict):
+        line = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            data, idx = self._open(name)
+            offset = data.tell()
+            data.write(line)
+            data.flush()
+            idx.write(_OFFSET.pack(offset))
+            idx.flush()
+            if self.fsync:
+                os.fsync(data.fileno())
+                os.fsync(idx.fileno())
+
+    def count(self, name: str) -> int:
+        _, idx_path, _ = self._paths(name)
+        try:
+            return idx_path.stat().st_size // _OFFSET.size
+        except FileNotFoundError:
+            return 0
+
+    def read(self, name: str, start: int, limit: int) -> list:
+        """Messages `start` .. `start + limit - 1` (by position in the session)."""
+        data_path, idx_path, _ = self._paths(name)
+        total = self.count(name)
+        start = max(0, start)
+        stop = min(total, start + limit)
+        if start >= stop:
+            return []
+        with self._lock:
+            handles = self._handles.get(_safe_name(name))
+            if handles:
+                handles[0].flush()
+        with open(idx_path, "rb") as idx:
+            idx.seek(start * _OFFSET.size)
+            begin = _OFFSET.unpack(idx.read(_OFFSET.size))[0]
+        with open(data_path, "rb") as data:
+            data.seek(begin)
+            return [json.loads(data.readline()) for _ in range(stop - start)]
+
+    def tail(self, name: str, limit: int) -> list:
+        return self.read(name, self.count(name) - limit, limit)
+
+    def set_meta(self, name: str, **meta):
+        _, _, meta_path = self._paths(name)
+        current = self.get_meta(name)
+        current.setdefault("created", datetime.now().isoformat())
+        owner = meta.get("owner")
+        if owner is not None and current.get("owner") != owner:
+            with open(self._owner_path(owner), "a", encoding="utf-8") as f:
+                f.write(_safe_name(name) + "\n")
+        current.update(meta)
+        tmp = meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(current, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, meta_path)
+
+    def get_meta(self, name: str) -> dict:
+        _, _, meta_path = self._paths(name)
+        try:
+            return json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+
+    def _owner_path(self, owner: str) -> Path:
+        return self.root / f"{_safe_name(owner)}.owner"
+
+    def list_sessions(self, owner: str = None) -> list:
+        """Session names with messages, most recently written first; only `owner`'s (see `set_meta`) if given."""
+        if owner is None:
+            files = self.root.glob("*.jsonl")
+        else:
+            try:
+                names = self._owner_path(owner).read_text(encoding="utf-8").split()
+            except FileNotFoundError:
+                names = []
+            files = [p for p in (self._paths(n)[0] for n in dict.fromkeys(names)) if p.exists()]
+        files = sorted(files, key=lambda p: p.stat().st_mtime, reverse=True)
+        return [p.stem for p in files]
+
+    def export_json(self, name: str, chunk_size: int = 1 << 16):
+        """Yield the session as one JSON document, in byte chunks.
+
+        Stored lines are already JSON, so they are copied as-is instead of
+        being parsed and re-serialized.
+        """
+        data_path, _, _ = self._paths(name)
+        meta = self.get_meta(name)
+        header = {"date": datetime.now().isoformat(), "session": name, "system_prompt": meta.get("system_prompt")}
+        yield json.dumps(header, ensure_ascii=False)[:-1].encode("utf-8") + b', "chat_data": ['
+        first = True
+        buffer = []
+        size = 0
+        if data_path.exists():
+            with open(data_path, "rb") as data:
+                for line in data:
+                    buffer.append(line.rstrip(b"\n") if first else b"," + line.rstrip(b"\n"))
+                    first = False
+                    size += len(line)
+                    if size >= chunk_size:
+                        yield b"".join(buffer)
+                        buffer, size = [], 0
+        buffer.append(b"]}")
+        yield b"".join(buffer)
+
+    def delete(self, name: str):
+        with self._lock:
+            for handle in self._handles.pop(_safe_name(name), ()):
+                handle.close()
+        for path in self._paths(name):
+            path.unlink(missing_ok=True)
+
+    def close(self):
+        with self._lock:
+            for handles in self._handles.values():
+                for handle in handles:
+                    handle.close()
+            self._handles.clear()
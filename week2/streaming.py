@@ -0,0 +1,39 @@
+import time
+
+
+class StreamStats:
+    """Timing of one streamed reply: time to first token and total time."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.ttft = None
+        self.total = None
+        self.chunks = 0
+        self.completed = False
+        self.error = None  # set by callers that turn a failed call into text
+
+    def summary(self) -> str:
+        ttft = f"{self.ttft:.2f}s" if self.ttft is not None else "-"
+        total = f"{self.total:.2f}s" if self.total is not None else "-"
+        return f"first token {ttft}, total {total}"
+
+
+def stream_chat(client, stats: StreamStats, **params):
+    """Yield the text deltas of a streamed Groq chat completion.
+
+    `stats` is filled in as the stream goes; `stats.completed` stays False if
+    the stream is interrupted (error, Ctrl+C, Streamlit rerun).
+    """
+    try:
+        stream = client.chat.completions.create(stream=True, **params)
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if stats.ttft is None:
+                stats.ttft = time.perf_counter() - stats.start
+            stats.chunks += 1
+            yield delta
+        stats.completed = True
+    finally:
+        stats.total = time.perf_counter() - stats.start
@@ -1,12 +1,13 @@
 from groq import Groq
 import os
 from dotenv import load_dotenv
+from memory import ConversationMemory, make_groq_summarizer
 load_dotenv()
 api_key=os.getenv("GROQ_API_KEY")
 class ChatImplementation:
   def __init__(self):
     self.client = Groq(api_key=api_key,)
-    self.chat_history=[]
+    self.memory=ConversationMemory(max_tokens=1500,summarizer=make_groq_summarizer(self.client))
   def get_response(self):
     while True:
       user_input=input("Enter the prompts or type exit to quit!\n")
@@ -14,9 +15,7 @@ class ChatImplementation:
         print("Good Bye")
         break
       try:
-        messages=[{'role':'system','content':"You are a helpful Assitance. Give the detail answer."}]
-        messages.extend(self.chat_history)
-        messages.append({'role':'user','content':user_input})
+        messages=self.memory.build_messages("You are a helpful Assitance. Give the detail answer.",user_input)
 
         chat_completion = self.client.chat.completions.create(
             messages=messages,
@@ -26,10 +25,8 @@ class ChatImplementation:
         )
 
         llm_response=chat_completion.choices[0].message.content
-        self.chat_history.append({'role':'user','content':user_input})
-        self.chat_history.append({'role':'assistant','content':llm_response})
-        if len(self.chat_history)>20:
-          self.chat_history=self.chat_history[-10:]
+        self.memory.add('user',user_input)
+        self.memory.add('assistant',llm_response)
         print("\n")
         print("*****************************************")
         print(llm_response)
@@ -1,23 +1,41 @@
 from groq import Groq
 import os
+import time
 from dotenv import load_dotenv
+from memory import ConversationMemory, make_groq_summarizer
+from streaming import StreamStats, stream_chat
+from semantic_cache import SemanticCache
 load_dotenv()
 api_key=os.getenv("GROQ_API_KEY")
 class SimpleChatBot:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: SemanticCache = None):
         """Initialize the chatbot with OpenAI API key"""
         self.client = Groq(api_key=api_key,)
-        self.conversation_history = []
+        # History is kept under a token budget; older turns are folded into a summary.
+        self.memory = ConversationMemory(max_tokens=2000, summarizer=make_groq_summarizer(self.client))
         self.system_prompt = "You are a helpful AI assistant."
+        self.last_stats = None
+        # Near-identical questions, asked with the same persona and history, are answered from here.
+        self.cache = cache
+    def cached_answer(self, user_input: str, context: str):
+        """`context` is the memory context key taken before this turn."""
+        if self.cache is None:
+            return None
+        answer, _ = self.cache.lookup(self.system_prompt, user_input, context)
+        if answer is not None:
+            self.memory.add("user", user_input)
+            self.memory.add("assistant", answer)
+        return answer
     def get_response(self, user_input: str) -> str:
  
-        messages = [{"role": "system", "content": self.system_prompt}]
-        
-        messages.extend(self.conversation_history)
-  
-        messages.append({"role": "user", "content": user_input})
+        context = self.memory.context_key()
+        answer = self.cached_answer(user_input, context)
+        if answer is not None:
+            return answer
+        messages = self.memory.build_messages(self.system_prompt, user_input)
         
         try:
+            start = time.perf_counter()
             response = self.client.chat.completions.create(
                 model="llama3-8b-8192",
                 messages=messages,
@@ -27,16 +45,47 @@ class SimpleChatBot:
             
             ai_response = response.choices[0].message.content
         
-            self.conversation_history.append({"role": "user", "content": user_input})
-            self.conversation_history.append({"role": "assistant", "content": ai_response})
-
-            if len(self.conversation_history) > 20:
-                self.conversation_history = self.conversation_history[-20:]
+            self.memory.add("user", user_input)
+            self.memory.add("assistant", ai_response)
+            if self.cache is not None:
+                self.cache.store(self.system_prompt, user_input, ai_response, time.perf_counter() - start, context)
             
             return ai_response
             
         except Exception as e:
             return f"❌ Error: {str(e)}"
+
+    def stream_response(self, user_input: str):
+        """Yield the reply as it is generated.
+
+        The turn is added to memory when the stream ends, including when it is
+        interrupted part way (the partial reply is kept and marked as such).
+        """
+        self.last_stats = stats = StreamStats()
+        context = self.memory.context_key()
+        answer = self.cached_answer(user_input, context)
+        if answer is not None:
+            stats.ttft = stats.total = time.perf_counter() - stats.start
+            stats.completed = True
+            yield answer
+            return
+        messages = self.memory.build_messages(self.system_prompt, user_input)
+        parts = []
+        try:
+            for delta in stream_chat(self.client, stats, model="llama3-8b-8192", messages=messages, max_tokens=200, temperature=0.7):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            yield f"❌ Error: {str(e)}"
+        finally:
+            if parts:
+                reply = "".join(parts)
+                if not stats.completed:
+                    reply += " [interrupted]"
+                elif self.cache is not None:
+                    self.cache.store(self.system_prompt, user_input, reply, stats.total, context)
+                self.memory.add("user", user_input)
+                self.memory.add("assistant", reply)
     
 def get_system_prompt_presets():
     """Return predefined system prompts"""
@@ -55,7 +104,7 @@ def main():
         return
 
     try:
-        chatbot = SimpleChatBot(api_key)
+        chatbot = SimpleChatBot(api_key, cache=SemanticCache())
         print("✅ Chatbot initialized successfully!")
     except Exception as e:
         print(f"❌ Failed to initialize chatbot: {e}")
@@ -67,6 +116,8 @@ def main():
         if not user_input:
             continue
         if user_input=="exit":
+            if chatbot.cache is not None:
+                print(f"📦 Cache: {chatbot.cache.stats()}")
             print("👋 Good Bye!")
             break
         elif user_input=="system":
@@ -78,7 +129,7 @@ def main():
             if choice in prompts:
                 name, prompt = prompts[choice]
                 chatbot.system_prompt=prompt
-                chatbot.conversation_history = [] 
+                chatbot.memory.clear()
                 print("System Prompt Updated!")
 
 
@@ -87,7 +138,7 @@ def main():
                 for key, (name, prompt) in prompts.items():
                     if choice.lower() == name.lower():
                         chatbot.system_prompt = prompt
-                        chatbot.conversation_history = []
+                        chatbot.memory.clear()
                         print(f"✅ System Prompt Updated to: {name}!")
                         found = True
                         break
@@ -95,9 +146,15 @@ def main():
                     print("❌ Invalid choice.")
         else:
             print(f"\n💡 Current system prompt: {chatbot.system_prompt}")
-            print("\n🤖 Assistant:", end=" ")
-            response = chatbot.get_response(user_input)
-            print(response)
+            print("\n🤖 Assistant:", end=" ", flush=True)
+            stream = chatbot.stream_response(user_input)
+            try:
+                for delta in stream:
+                    print(delta, end="", flush=True)
+            except KeyboardInterrupt:
+                stream.close()  # records the partial reply
+                print("\n⏹️ Interrupted.")
+            print(f"\n({chatbot.last_stats.summary()})")
 
 if __name__=="__main__":
     main()
@@ -3,8 +3,11 @@ from groq import Groq
 import streamlit as st
 from dotenv import load_dotenv
 from typing import List, Dict
-import json
 from datetime import datetime
+from uuid import uuid4
+from memory import ConversationMemory, make_groq_summarizer
+from streaming import StreamStats, stream_chat
+from session_store import SessionStore
 load_dotenv()
 api_key=os.getenv("GROQ_API_KEY")
 
@@ -14,6 +17,19 @@ st.set_page_config(
     layout="wide"
 )
 
+# Only the most recent messages are rendered on each rerun; older ones are
+# loaded a page at a time on request, so render cost doesn't grow with the chat.
+HISTORY_WINDOW=20
+
+# Persona -> system prompt.
+SYSTEM_PROMPTS={
+    "General Assistant": "You are a helpful, friendly, and knowledgeable AI assistant. Provide clear and accurate information.",
+    "Code Tutor": "You are an expert programming tutor. Explain coding concepts clearly with examples. Ask follow-up questions to ensure understanding.",
+    "Creative Writer": "You are a creative writing assistant. Help with brainstorming, storytelling, and creative projects. Be imaginative and inspiring.",
+    "Data Analyst": "You are a data analysis expert. Help interpret data, suggest analysis methods, and explain statistical concepts clearly.",
+    "Business Consultant": "You are a professional business consultant. Provide strategic advice, market insights, and practical business solutions.",
+}
+
 class ChatBot:
     def __init__(self):
         self.client=Groq(api_key=api_key,)
@@ -30,7 +46,59 @@ class ChatBot:
         except Exception as e:
             return (f"Error {str(e)}")
 
-def Session_state():
+    def stream_response(self, messages: List[Dict], stats: StreamStats):
+        """Yield the reply as it is generated (errors are yielded as text and set `stats.error`)."""
+        try:
+            yield from stream_chat(self.client, stats, model="llama3-8b-8192", messages=messages, temperature=0.7, max_tokens=200)
+        except Exception as e:
+            stats.error = f"Error {str(e)}"
+            yield stats.error
+
+    def summarizer(self):
+        return make_groq_summarizer(self.client)
+
+@st.cache_resource
+def get_chatbot():
+    """One ChatBot (and Groq client with its connection pool) for all reruns and sessions."""
+    return ChatBot()
+
+@st.cache_resource
+def get_session_store():
+    """Chats are persisted message by message under week2/sessions/."""
+    return SessionStore()
+
+def load_session(store,name):
+    """Switch to a stored session: only its last page of messages is read."""
+    meta=store.get_meta(name)
+    st.session_state.session_name=name
+    st.session_state.chat_history=store.tail(name,HISTORY_WINDOW)
+    st.session_state.history_start=store.count(name)-len(st.session_state.chat_history)
+    st.session_state.history_shown=HISTORY_WINDOW
+    if meta.get("persona") in SYSTEM_PROMPTS:
+        st.session_state.persona_select=meta["persona"]
+        st.session_state.system_prompt=SYSTEM_PROMPTS[meta["persona"]]
+    # the saved summary plus the last page; re-adding messages one by one
+    # could fold them again, i.e. call the summarizer just to open a session
+    st.session_state.memory.restore(meta.get("summary",""),st.session_state.chat_history)
+    st.session_state.saved_summary=meta.get("summary","")
+
+def new_session(store,persona):
+    """Create a stored session owned by this browser session."""
+    owner=st.session_state.owner
+    name=f"chat_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{owner[:8]}"
+    store.set_meta(name,persona=persona,system_prompt=SYSTEM_PROMPTS[persona],owner=owner)
+    return name
+
+def open_session(name):
+    """Load `name` on the next run, before the sidebar widgets are created."""
+    st.session_state.pending_session=name
+    st.rerun()
+
+def save_message(store,message):
+    st.session_state.chat_history.append(message)
+    store.append(st.session_state.session_name,message)
+
+def Session_state(chatbot,store):
     """Intilizing the session states"""
     if "messages" not in st.session_state:
         st.session_state.messages=[]
@@ -38,32 +106,33 @@ def Session_state():
         st.session_state.system_prompt="You are a AI Assistant, please provide the accurate result."
     if "chat_history" not in st.session_state:
         st.session_state.chat_history=[]
+    if "memory" not in st.session_state:
+        # what is sent to the model: token-budgeted history + rolling summary
+        st.session_state.memory=ConversationMemory(max_tokens=2000,summarizer=chatbot.summarizer())
+    if "history_shown" not in st.session_state:
+        st.session_state.history_shown=HISTORY_WINDOW
+    if "owner" not in st.session_state:
+        # sessions are private to the browser session that created them
+        st.session_state.owner=uuid4().hex
+    if "session_name" not in st.session_state:
+        load_session(store,new_session(store,next(iter(SYSTEM_PROMPTS))))
+    if st.session_state.get("pending_session"):
+        load_session(store,st.session_state.pop("pending_session"))
 
-def system_prompt():
-    return {
-        "General Assistant": "You are a helpful, friendly, and knowledgeable AI assistant. Provide clear and accurate information.",
-        "Code Tutor": "You are an expert programming tutor. Explain coding concepts clearly with examples. Ask follow-up questions to ensure understanding.",
-        "Creative Writer": "You are a creative writing assistant. Help with brainstorming, storytelling, and creative projects. Be imaginative and inspiring.",
-        "Data Analyst": "You are a data analysis expert. Help interpret data, suggest analysis methods, and explain statistical concepts clearly.",
-        "Business Consultant": "You are a professional business consultant. Provide strategic advice, market insights, and practical business solutions.",
-    }
-def export_chat_history():
-    if st.session_state.chat_history:
-        export_data={
-            "date":datetime.now().isoformat(),
-            "system_prompt":st.session_state.system_prompt,
-            "chat_data":st.session_state.chat_history,
-        }
-        return json.dumps(export_data,indent=2)
+def export_chat_history(store):
+    """The whole session as JSON, streamed from the store without re-serializing it."""
+    if store.count(st.session_state.session_name):
+        return b"".join(store.export_json(st.session_state.session_name))
     return None
 def main():
     st.title("Welcome to Conversational Chat")
-    Session_state()
-    chatbot=ChatBot()
+    chatbot=get_chatbot()
+    store=get_session_store()
+    Session_state(chatbot,store)
     with st.sidebar:
         st.header("System Configuration")
 
-        prompts=system_prompt()
+        prompts=SYSTEM_PROMPTS
         selected_persona =st.selectbox(
             "SELECT AI PERSONA",
             list(prompts.keys()),
@@ -71,10 +140,21 @@ def main():
 
         )
         if st.session_state.system_prompt != prompts[selected_persona]:
-            st.session_state.system_prompt=prompts[selected_persona]
-            st.session_state.chat_history=[]
+            # a new persona starts a new stored session; the old one stays on disk
             st.session_state.messages=[]
-            st.rerun()
+            st.session_state.system_prompt=prompts[selected_persona]
+            open_session(new_session(store,selected_persona))
+
+        st.header("🗂️ Sessions")
+        sessions=store.list_sessions(owner=st.session_state.owner)
+        current=st.session_state.session_name
+        if current not in sessions:
+            sessions.insert(0,current)
+        selected_session=st.selectbox("Open session",sessions,index=sessions.index(current))
+        if selected_session!=current:
+            open_session(selected_session)
+        if st.button("New session"):
+            open_session(new_session(store,selected_persona))
 
         with st.expander("View System Prompt"):
             st.text_area("Current System Prompt",
@@ -86,7 +166,7 @@ def main():
 
         if st.session_state.chat_history:
             if st.button("Export Chat History"):
-                export=export_chat_history()
+                export=export_chat_history(store)
                 if export:
                     st.download_button(
                         "Download JSON",
@@ -97,11 +177,24 @@ def main():
     st.header("💬 Conversation")
     chat_container = st.container()
     with chat_container:
-        for message in st.session_state.chat_history:
+        history=st.session_state.chat_history
+        hidden=st.session_state.history_start+max(0,len(history)-st.session_state.history_shown)
+        if hidden>0:
+            if st.button(f"Show earlier messages ({hidden} hidden)"):
+                st.session_state.history_shown+=HISTORY_WINDOW
+                missing=min(st.session_state.history_shown-len(history),st.session_state.history_start)
+                if missing>0:
+                    # page older messages in from the store
+                    start=st.session_state.history_start-missing
+                    st.session_state.chat_history=store.read(st.session_state.session_name,start,missing)+history
+                    st.session_state.history_start=start
+                st.rerun()
+        for message in history[-st.session_state.history_shown:]:
             with st.chat_message(message["role"]):
                 st.write(message["content"])
                 if message["role"] == "assistant":
-                    st.caption(f"Generated at {message.get('timestamp', 'Unknown time')}")
+                    ttft = f" · first token {message['ttft']:.2f}s" if message.get("ttft") is not None else ""
+                    st.caption(f"Generated at {message.get('timestamp', 'Unknown time')}{ttft}")
     
     if user_input := st.chat_input("Type your message here..."):
         # Add user message to history
@@ -110,34 +203,52 @@ def main():
             "content": user_input,
             "timestamp": datetime.now().strftime("%H:%M:%S")
         }
-        st.session_state.chat_history.append(user_message)
+        save_message(store,user_message)
 
         with st.chat_message("user"):
                 st.write(user_input)
     
-        api_messages = [
-                {"role": "system", "content": st.session_state.system_prompt}
-            ]
-        recent_messages = st.session_state.chat_history[-10:]
-        for msg in recent_messages:
-                api_messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
+        api_messages = st.session_state.memory.build_messages(st.session_state.system_prompt, user_input)
     
         with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    response = chatbot.get_response(api_messages)
-                    st.write(response)
-                    st.caption(f"Generated at {datetime.now().strftime('%H:%M:%S')}")
-    
-        assistant_message = {
-                "role": "assistant",
-                "content": response,
-                "timestamp": datetime.now().strftime("%H:%M:%S")
-            }
-        st.session_state.chat_history.append(assistant_message)
-        st.rerun()
+                stats = StreamStats()
+                parts = []
+
+                def record_reply():
+                    # Runs when the stream finishes or is cut off by a rerun/stop,
+                    # so a partial reply is still saved to the history.
+                    response = "".join(parts)
+                    if stats.error is None and not stats.completed:
+                        response += " [interrupted]"
+                    save_message(store, {
+                        "role": "assistant",
+                        "content": response,
+                        "timestamp": datetime.now().strftime("%H:%M:%S"),
+                        "ttft": stats.ttft,
+                    })
+                    if stats.error is not None:
+                        return  # shown and stored, but not sent back to the model
+                    memory = st.session_state.memory
+                    memory.add("user", user_input)
+                    memory.add("assistant", response)
+                    # summaries are written in the background; persist the latest
+                    # one so reopening the session doesn't have to rebuild it
+                    if memory.summary != st.session_state.saved_summary:
+                        store.set_meta(st.session_state.session_name, summary=memory.summary)
+                        st.session_state.saved_summary = memory.summary
+
+                def tracked_stream():
+                    try:
+                        for delta in chatbot.stream_response(api_messages, stats):
+                            parts.append(delta)
+                            yield delta
+                    finally:
+                        record_reply()
+
+                st.write_stream(tracked_stream())
+                st.caption(f"Generated at {datetime.now().strftime('%H:%M:%S')} · {stats.summary()}")
+        # The new turn is already on screen and in the history, so no
+        # st.rerun() here: that would render the whole page a second time.
 
 if __name__=="__main__":
     main()
\ No newline at end of file
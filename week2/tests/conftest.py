@@ -0,0 +1,7 @@
+import os
+import sys
+from pathlib import Path
+
+# The week2 modules import each other as top-level modules (python task2.py).
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("GROQ_API_KEY", "test")
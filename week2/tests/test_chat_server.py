@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("groq")
+pytest.importorskip("httpx")
+from chat_server import ChatService, SessionBusy, handle_connection
+from fake_groq import start_fake_groq
+
+
+@pytest.fixture
+def fake_groq():
+    server, url = start_fake_groq(latency=0.05, jitter=0.0)
+    yield server, url
+    server.shutdown()
+
+
+def test_tcp_session_round_trip(fake_groq):
+    server, url = fake_groq
+
+    async def scenario():
+        service = ChatService(base_url=url)
+        tcp = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), "127.0.0.1", 0)
+        port = tcp.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            greeting = await reader.readline()
+            writer.write(b"What is the capital of France?\n")
+            reply = await reader.readline()
+            writer.write(b"/system 2\n")
+            switched = await reader.readline()
+            writer.write(b"exit\n")
+            closed = await reader.read()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+            tcp.close()
+            await tcp.wait_closed()
+            await service.close()
+        return greeting.decode(), reply.decode(), switched.decode(), closed, service
+
+    greeting, reply, switched, closed, service = asyncio.run(scenario())
+    assert "ready" in greeting
+    assert reply.startswith("Reply 1 to: What is the capital of France?")
+    assert "Creative Writer" in switched
+    assert closed == b""
+    assert service.sessions == {}
+    assert service.stats()["completed"] == 1
+
+
+def test_sessions_keep_their_own_history(fake_groq):
+    server, url = fake_groq
+
+    async def scenario():
+        service = ChatService(base_url=url)
+        first, second = service.create_session(), service.create_session(preset="3")
+        await asyncio.gather(service.chat(first, "hello"), service.chat(second, "hi"))
+        await service.chat(first, "and again")
+        await service.close()
+        return service, first, second
+
+    service, first, second = asyncio.run(scenario())
+    assert len(service.sessions[first].bot.memory.messages) == 4
+    assert len(service.sessions[second].bot.memory.messages) == 2
+    assert service.sessions[second].bot.system_prompt.startswith("You are a technical expert")
+    assert server.requests == 3
+
+
+def test_session_rejects_messages_beyond_max_pending(fake_groq):
+    _, url = fake_groq
+
+    async def scenario():
+        service = ChatService(base_url=url, max_pending=1)
+        session = service.create_session()
+        results = await asyncio.gather(service.chat(session, "one"), service.chat(session, "two"), return_exceptions=True)
+        await service.close()
+        return service, results
+
+    service, results = asyncio.run(scenario())
+    assert isinstance(results[1], SessionBusy)
+    assert service.stats()["rejected"] == 1
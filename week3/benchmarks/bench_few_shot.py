@@ -0,0 +1,86 @@
+"""Few-shot prompt construction: per-puzzle dataset scan vs. a prebuilt ExampleIndex.
+
+Synthetic logic puzzles are generated from templates so datasets of any
+size can be timed. Run from the week3 directory:
+
+    PYTHONPATH=src python -m benchmarks.bench_few_shot --sizes 1000 10000 50000
+"""
+import argparse
+import json
+import random
+import time
+
+from ai_prompting.example_index import ExampleIndex
+from ai_prompting.prompts import few_shot_prompt
+
+NAMES = ["Alice", "Bob", "Charlie", "Dana", "Eve", "Frank", "Grace", "Heidi", "Ivan", "Judy", "Mallory", "Oscar"]
+THINGS = ["apples", "oranges", "coins", "marbles", "books", "keys", "boxes", "cards", "stamps", "shells"]
+TEMPLATES = [
+    ("{a} is older than {b}. {b} is older than {c}. Who is the youngest?", "{c}"),
+    ("{a} has {n} {x}. {b} gives {a} {m} more {x}. How many {x} does {a} have?", "{total}"),
+    ("If all {a}-folk are {b}-folk and all {b}-folk are {c}-folk, are all {a}-folk {c}-folk?", "Yes"),
+    ("{a} is taller than {b} but shorter than {c}. Who is the tallest?", "{c}"),
+    ("There are {n} {x} in a box and {a} takes {m}. How many {x} are left?", "{left}"),
+    ("{a} sits left of {b}, and {c} sits right of {b}. Who sits in the middle?", "{b}"),
+]
+
+
+def make_dataset(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    dataset = []
+    for i in range(n):
+        template, answer = rng.choice(TEMPLATES)
+        a, b, c = rng.sample(NAMES, 3)
+        big, small = rng.randint(10, 99), rng.randint(1, 9)
+        values = dict(a=a, b=b, c=c, x=rng.choice(THINGS), n=big, m=small, total=big + small, left=big - small)
+        dataset.append({"id": i, "puzzle": template.format(**values), "expected_answer": answer.format(**values)})
+    return dataset
+
+
+def time_per_prompt(build, puzzles):
+    start = time.perf_counter()
+    for puzzle in puzzles:
+        build(puzzle)
+    return (time.perf_counter() - start) / len(puzzles)
+
+
+def run(n: int, queries: int, k: int):
+    dataset = make_dataset(n)
+    puzzles = [d["puzzle"] for d in random.Random(1).sample(dataset, min(queries, n))]
+    result = {"items": n}
+
+    rng = random.Random(0)
+    result["scan_ms"] = round(time_per_prompt(lambda p: few_shot_prompt(p, dataset, k, rng=rng), puzzles) * 1000, 4)
+
+    start = time.perf_counter()
+    index = ExampleIndex(dataset, max_neighbors=k)
+    result["index_s"] = round(time.perf_counter() - start, 3)
+    rng = random.Random(0)
+    result["random_ms"] = round(
+        time_per_prompt(lambda p: few_shot_prompt(p, dataset, k, rng=rng, index=index), puzzles) * 1000, 4
+    )
+
+    start = time.perf_counter()
+    index.build()
+    result["similarity_build_s"] = round(time.perf_counter() - start, 3)
+    result["similar_ms"] = round(
+        time_per_prompt(lambda p: few_shot_prompt(p, dataset, k, index=index, selection="similar"), puzzles) * 1000, 4
+    )
+    result["sweep_scan_s"] = round(result["scan_ms"] * n / 1000, 2)
+    result["sweep_similar_s"] = round(result["similarity_build_s"] + result["similar_ms"] * n / 1000, 2)
+    result.update(index.stats())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--queries", type=int, default=200, help="Puzzles timed per size")
+    parser.add_argument("--k", type=int, default=2, help="Examples per prompt")
+    args = parser.parse_args()
+    for n in args.sizes:
+        print(json.dumps(run(n, args.queries, args.k)))
+
+
+if __name__ == "__main__":
+    main()
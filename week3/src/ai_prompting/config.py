@@ -17,4 +17,12 @@ def get_api_key() -> str:
 
 
 
-DEFAULT_MODEL = "llama-3.3-70b-versatile"
\ No newline at end of file
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# Groq budgets for DEFAULT_MODEL on the free tier; override for other plans/models.
+REQUESTS_PER_MINUTE = int(os.getenv("GROQ_RPM", "30"))
+TOKENS_PER_MINUTE = int(os.getenv("GROQ_TPM", "12000"))
+
+# Opt-in on-disk cache of chat responses (see response_cache.py).
+RESPONSE_CACHE_PATH = Path(os.getenv("RESPONSE_CACHE_PATH", "outputs/response_cache.sqlite"))
+RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", "256"))
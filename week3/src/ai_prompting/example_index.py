@@ -0,0 +1,175 @@
+"""Few-shot example selection over a dataset, indexed once per run."""
+import math
+import random
+import re
+from collections import Counter
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+def _terms(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+class _Without(Sequence):
+    """Read-only view of `items` minus the (sorted) positions in `skip`, without copying."""
+
+    def __init__(self, items: List[Dict], skip: List[int]):
+        self.items = items
+        self.skip = skip
+
+    def __len__(self) -> int:
+        return len(self.items) - len(self.skip)
+
+    def __getitem__(self, i: int) -> Dict:
+        if i < 0:
+            i += len(self)
+        for pos in self.skip:
+            if pos > i:
+                break
+            i += 1
+        return self.items[i]
+
+
+class ExampleIndex:
+    """Candidate few-shot examples of one dataset, with precomputed nearest neighbours.
+
+    Candidates are the items that have an expected answer, in dataset order,
+    as in `few_shot_prompt`. `select(..., method="random")` draws the same
+    examples as the unindexed scan for the same RNG state, but without
+    rebuilding the candidate list for every puzzle.
+
+    `method="similar"` returns the k candidates with the highest TF-IDF cosine
+    similarity (sublinear tf, smoothed idf, `max_features` most frequent
+    terms) over a float32 matrix of candidates x `max_features` x 4 bytes.
+    The top `max_neighbors` of dataset puzzles are computed a block of
+    `block_size` puzzles at a time, with one matrix product per block, the
+    first time a puzzle in that block is looked up (`build` computes them
+    all). Later lookups are an array slice. Items with the same puzzle text
+    are never returned as examples for each other.
+    """
+
+    def __init__(self, dataset: List[Dict], max_neighbors: int = 8, max_features: int = 2048, block_size: int = 512):
+        self.max_neighbors = max_neighbors
+        self.max_features = max_features
+        self.block_size = block_size
+        self.candidates = [d for d in dataset if d.get("expected_answer")]
+        # puzzle text -> sorted candidate positions with that text
+        self._same_text: Dict[str, List[int]] = {}
+        for pos, d in enumerate(self.candidates):
+            self._same_text.setdefault(d.get("puzzle"), []).append(pos)
+        self._puzzles = [d.get("puzzle") or "" for d in dataset]
+        self._row = {p: i for i, p in reversed(list(enumerate(self._puzzles)))}
+        self._vocab: Optional[Dict[str, int]] = None
+        self._idf: Optional[np.ndarray] = None
+        self._matrix: Optional[np.ndarray] = None  # candidates x features, rows L2-normalized
+        self._neighbors: Optional[np.ndarray] = None  # dataset rows x max_neighbors candidate positions
+        self._block_done: Optional[np.ndarray] = None
+
+    def select(self, puzzle: str, k: int, method: str = "random", rng: Optional[random.Random] = None) -> List[Dict]:
+        if method == "random":
+            return self._random(puzzle, k, rng or random)
+        if method == "similar":
+            return [self.candidates[i] for i in self.similar(puzzle, k)]
+        raise ValueError(f"Unknown example selection method: {method}")
+
+    def _random(self, puzzle: str, k: int, rng) -> List[Dict]:
+        excluded = self._same_text.get(puzzle)
+        # same sequence as the scan's filtered list, so rng.sample picks the same examples
+        population = _Without(self.candidates, excluded) if excluded else self.candidates
+        if not len(population):
+            return []
+        return rng.sample(population, min(len(population), k))
+
+    def similar(self, puzzle: str, k: int) -> List[int]:
+        """Candidate positions of the k examples most similar to `puzzle`, best first."""
+        self._fit()
+        row = self._row.get(puzzle)
+        if row is not None and k <= self.max_neighbors:
+            block = row // self.block_size
+            if not self._block_done[block]:
+                self._neighbor_block(block)
+            hits = self._neighbors[row, :k]
+            return [int(i) for i in hits if i >= 0]
+        scores = self._matrix @ self._vectorize([puzzle])[0]
+        for pos in self._same_text.get(puzzle, ()):
+            scores[pos] = -np.inf
+        return [int(i) for i in self._top_k(scores[None, :], k)[0] if i >= 0]
+
+    def build(self) -> None:
+        """Precompute the neighbours of every dataset puzzle (idempotent)."""
+        self._fit()
+        for block in range(len(self._block_done)):
+            if not self._block_done[block]:
+                self._neighbor_block(block)
+
+    def _fit(self) -> None:
+        if self._matrix is not None:
+            return
+        docs = [_terms(d.get("puzzle") or "") for d in self.candidates]
+        df = Counter(t for terms in docs for t in set(terms))
+        vocab = [t for t, _ in sorted(df.items(), key=lambda kv: (-kv[1], kv[0]))[: self.max_features]]
+        self._vocab = {t: i for i, t in enumerate(vocab)}
+        n = max(len(docs), 1)
+        self._idf = np.array([math.log((1 + n) / (1 + df[t])) + 1.0 for t in vocab], dtype=np.float32)
+        self._matrix = self._vectorize_terms(docs)
+
+        # ids of puzzle texts, to mask same-text pairs
+        text_ids = {p: i for i, p in enumerate(self._same_text)}
+        self._candidate_text = np.array([text_ids[d.get("puzzle")] for d in self.candidates], dtype=np.int64)
+        self._query_text = np.array([text_ids.get(p, -1) for p in self._puzzles], dtype=np.int64)
+        self._neighbors = np.full((len(self._puzzles), self.max_neighbors), -1, dtype=np.int64)
+        self._block_done = np.zeros(-(-len(self._puzzles) // self.block_size), dtype=bool)
+
+    def _neighbor_block(self, block: int) -> None:
+        start, stop = block * self.block_size, (block + 1) * self.block_size
+        scores = self._vectorize(self._puzzles[start:stop]) @ self._matrix.T
+        scores[self._query_text[start:stop, None] == self._candidate_text[None, :]] = -np.inf
+        self._neighbors[start:stop] = self._top_k(scores, self.max_neighbors)
+        self._block_done[block] = True
+
+    def _top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """Column indices of the k best scores per row, best first; -1 pads rows with too few.
+
+        k is small for few-shot prompts, so k argmax passes beat a partition
+        of every row; ties go to the lowest position. Scores are rounded first,
+        since the matrix product can differ in the last bits between equal
+        candidates or block sizes. Overwrites `scores`.
+        """
+        np.round(scores, 5, out=scores)
+        out = np.full((scores.shape[0], k), -1, dtype=np.int64)
+        rows = np.arange(scores.shape[0])
+        for j in range(min(k, scores.shape[1])):
+            best = scores.argmax(axis=1)
+            found = scores[rows, best] > -np.inf
+            out[found, j] = best[found]
+            scores[rows, best] = -np.inf
+        return out
+
+    def _vectorize(self, texts: List[str]) -> np.ndarray:
+        return self._vectorize_terms([_terms(t) for t in texts])
+
+    def _vectorize_terms(self, docs: List[List[str]]) -> np.ndarray:
+        rows, cols, counts = [], [], []
+        for r, terms in enumerate(docs):
+            for term, count in Counter(t for t in terms if t in self._vocab).items():
+                rows.append(r)
+                cols.append(self._vocab[term])
+                counts.append(count)
+        matrix = np.zeros((len(docs), len(self._vocab)), dtype=np.float32)
+        if rows:
+            tf = 1.0 + np.log(np.array(counts, dtype=np.float32))
+            matrix[np.array(rows), np.array(cols)] = tf * self._idf[np.array(cols)]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "candidates": len(self.candidates),
+            "features": len(self._vocab) if self._vocab is not None else 0,
+            "matrix_bytes": int(self._matrix.nbytes) if self._matrix is not None else 0,
+        }
@@ -0,0 +1,84 @@
+"""Append-only JSONL journal of experiment records, used for crash-safe resume."""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[Hashable, str]
+
+
+class RunJournal:
+    """One JSON line per finished (puzzle id, strategy) record.
+
+    Records are appended and flushed as soon as they complete, so a crash
+    loses at most the calls that were in flight. Writing is O(1) per record,
+    unlike rewriting the full results file. The first line is a header with
+    the run settings. A torn last line left by a crash is skipped when the
+    journal is read back.
+    """
+
+    def __init__(self, path: Path, resume: bool = False, fsync: bool = False, **settings: Any):
+        self.path = Path(path)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        if resume and self.path.exists():
+            header = self.header()
+            changed = {k: (header.get(k), v) for k, v in settings.items() if header.get(k) != v}
+            if changed:
+                logger.warning(f"Resuming a run with different settings (journal, now): {changed}")
+            self._file = open(self.path, "a+b")
+            self._file.seek(0, os.SEEK_END)
+            if self._file.tell():
+                self._file.seek(-1, os.SEEK_END)
+                if self._file.read(1) != b"\n":
+                    # the previous run died mid-line; start the next record on its own line
+                    self._file.write(b"\n")
+        else:
+            self._file = open(self.path, "wb")
+            self._write({"type": "run", **settings})
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._write({"type": "item", **record})
+
+    def _lines(self):
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable journal line in {self.path}")
+
+    def header(self) -> Dict[str, Any]:
+        for record in self._lines():
+            if record.get("type") == "run":
+                return record
+        return {}
+
+    def records(self) -> Dict[Key, Dict[str, Any]]:
+        """Latest record per (id, strategy); a later success replaces an earlier error."""
+        latest: Dict[Key, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return latest
+        for record in self._lines():
+            if record.get("type") == "item":
+                latest[(record["id"], record["strategy"])] = record
+        return latest
+
+    def completed(self) -> Dict[Key, Dict[str, Any]]:
+        return {key: r for key, r in self.records().items() if "error" not in r}
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
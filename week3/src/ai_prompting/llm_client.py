@@ -1,8 +1,11 @@
 from groq import Groq
+from types import SimpleNamespace
 from typing import Any, Dict, List, Optional
 import time
 import logging
 from .config import get_api_key
+from .response_cache import ResponseCache, request_key
+from .scheduler import RateLimiter, estimate_tokens
 
 
 logger = logging.getLogger(__name__)
@@ -12,10 +15,19 @@ class GroqClientWrapper:
     """Simple wrapper to centralize Groq calls and retries."""
 
 
-    def __init__(self, api_key: Optional[str] = None, model: str = None):
-        self.api_key = api_key or get_api_key()
+    def __init__(self, api_key: Optional[str] = None, model: str = None, rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None):
         self.model = model
-        self.client = Groq(api_key=self.api_key)
+        # shared by every thread that uses this wrapper
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        if cache is not None and cache.replay_only:
+            # replaying never touches the network, so no key is needed
+            self.api_key = api_key
+            self.client = None
+        else:
+            self.api_key = api_key or get_api_key()
+            self.client = Groq(api_key=self.api_key)
 
 
     def chat(self,
@@ -29,8 +41,17 @@ class GroqClientWrapper:
         """Call Groq chat completions with a simple retry/backoff.
 
 
-        Returns the raw `choices[0].message` dict (or raises).
+        Returns the raw `choices[0].message` dict (or raises). With a cache,
+        an identical earlier request is answered from disk; in replay-only
+        mode a miss raises ReplayMiss.
         """
+        key = None
+        if self.cache is not None:
+            key = request_key(self.model, messages, temperature, max_tokens, response_format)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return SimpleNamespace(**cached)
+
         for attempt in range(1, retries + 1):
             try:
                 params = dict(
@@ -42,12 +63,36 @@ class GroqClientWrapper:
                 if response_format is not None:
                     params["response_format"] = response_format
 
+                estimated = estimate_tokens(messages, max_tokens)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(estimated)
 
                 response = self.client.chat.completions.create(**params)
-                return response.choices[0].message
+                if self.rate_limiter is not None:
+                    usage = getattr(response, "usage", None)
+                    self.rate_limiter.settle(estimated, getattr(usage, "total_tokens", None))
+                message = response.choices[0].message
+                if key is not None:
+                    self.cache.put(key, self.model, {"role": getattr(message, "role", "assistant"), "content": message.content})
+                return message
 
             except Exception as e:
                 logger.warning(f"Groq call failed (attempt {attempt}/{retries}): {e}")
                 if attempt == retries:
                     raise
-                time.sleep(backoff * attempt)
\ No newline at end of file
+                retry_after = _retry_after(e)
+                if retry_after is not None and self.rate_limiter is not None:
+                    self.rate_limiter.penalize(retry_after)
+                else:
+                    time.sleep(retry_after if retry_after is not None else backoff * attempt)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from the Retry-After header of a 429 response, if there is one."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) != 429:
+        return None
+    try:
+        return float(response.headers.get("retry-after", 1.0))
+    except (TypeError, ValueError):
+        return 1.0
\ No newline at end of file
@@ -1,21 +1,32 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, TYPE_CHECKING
 import random
 
+if TYPE_CHECKING:
+    from .example_index import ExampleIndex
+
 def zero_shot_prompt(puzzle: str) -> str:
     return (
     "Answer only with the final single-word/single-line answer. No explanation, no extra text.\n"
     f"Puzzle: {puzzle}"
     )
 
-def few_shot_prompt(puzzle: str, dataset: List[Dict], num_examples: int = 2) -> str:
-    """Construct a few-shot prompt using `num_examples` examples from dataset (excluding the current puzzle)."""
-    examples = []
-    # choose up to num_examples random other items
-    candidates = [d for d in dataset if d.get("puzzle") != puzzle and d.get("expected_answer")]
-    if not candidates:
-        chosen = []
+def few_shot_prompt(puzzle: str, dataset: List[Dict], num_examples: int = 2, rng: Optional[random.Random] = None,
+                    index: Optional["ExampleIndex"] = None, selection: str = "random") -> str:
+    """Construct a few-shot prompt using `num_examples` examples from dataset (excluding the current puzzle).
+
+    Pass `rng` to draw from a private generator instead of the global `random` state.
+    With an `index` built once for `dataset`, examples come from it ("random" or
+    "similar" `selection`) instead of a scan of the whole dataset per puzzle.
+    """
+    if index is not None:
+        chosen = index.select(puzzle, num_examples, method=selection, rng=rng)
     else:
-        chosen = random.sample(candidates, min(len(candidates), num_examples))
+        # choose up to num_examples random other items
+        candidates = [d for d in dataset if d.get("puzzle") != puzzle and d.get("expected_answer")]
+        if not candidates:
+            chosen = []
+        else:
+            chosen = (rng or random).sample(candidates, min(len(candidates), num_examples))
 
 
     prompt = "Solve the puzzle. I will give you examples:\n\n"
@@ -0,0 +1,127 @@
+"""Persistent cache of chat completions for deterministic (temperature 0) experiment calls."""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMiss(LookupError):
+    """A replay-only cache was asked for a response it does not have."""
+
+
+def request_key(
+    model: Optional[str],
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict[str, Any]],
+) -> str:
+    """SHA-256 of the canonical JSON of everything that determines the response."""
+    canonical = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": float(temperature),
+            "max_tokens": max_tokens,
+            "response_format": response_format,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed map from request key to the returned message.
+
+    The database runs in WAL mode with a busy timeout, so worker threads and
+    several runner processes can share one file. One connection is used per
+    instance, behind a lock. When the stored responses exceed `max_bytes`,
+    the least recently used ones are deleted until the total is back under
+    90% of the budget. With `replay_only`, a miss raises ReplayMiss instead
+    of letting the caller go to the network.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024, replay_only: bool = False):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, value TEXT, size INTEGER, created_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+        (self._bytes,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                if self.replay_only:
+                    raise ReplayMiss(f"No cached response for request {key[:12]} (replay-only mode)")
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, model: Optional[str], value: Dict[str, Any]) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, data, len(data), now, now),
+            )
+            self.writes += 1
+            self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # other processes may have written too, so recount before trimming
+        target = int(self.max_bytes * 0.9)
+        cursor = self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running"
+            " FROM responses) WHERE running > ?)",
+            (target,),
+        )
+        self.evictions += max(cursor.rowcount, 0)
+        (self._bytes,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        logger.info(f"Response cache trimmed to {self._bytes / 1e6:.1f} MB ({cursor.rowcount} evicted)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self._bytes,
+                "replay_only": self.replay_only,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -4,19 +4,23 @@ import json
 import logging
 import random
 import statistics
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .llm_client import GroqClientWrapper
 from .prompts import zero_shot_prompt, few_shot_prompt, cot_prompt
-from .grader import grade_score
-from .config import DEFAULT_MODEL
+from .grader import grade_outputs, grade_score
+from .config import DEFAULT_MODEL, REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE, RESPONSE_CACHE_PATH, RESPONSE_CACHE_MAX_MB
+from .example_index import ExampleIndex
+from .journal import RunJournal
+from .response_cache import ResponseCache
+from .scheduler import RateLimiter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-random.seed(0)  # reproducible few-shot choices
-
 
 def load_dataset(path: Path) -> List[Dict[str, Any]]:
     if not path.exists():
@@ -51,125 +55,255 @@ def _extract_content(resp_msg: Any) -> str:
         return str(content)
 
 
-def run_experiment(
-    dataset_path: Path,
-    outdir: Path,
-    model: str = DEFAULT_MODEL,
-    max_items: Optional[int] = None,
-    save_every: int = 10,
-):
-    outdir.mkdir(parents=True, exist_ok=True)
-    dataset = load_dataset(dataset_path)
-    client = GroqClientWrapper(model=model)
+# strategy name -> completion budget for its answer
+STRATEGIES = {"zero_shot": 200, "few_shot": 300, "cot": 400}
 
-    results: List[Dict[str, Any]] = []
-    scores: List[Dict[str, Any]] = []
 
-    items = dataset if max_items is None else dataset[:max_items]
+def build_prompts(puzzle: str, dataset: List[Dict[str, Any]], rng: random.Random,
+                  index: Optional[ExampleIndex] = None, few_shot: str = "random") -> Dict[str, str]:
+    return {
+        "zero_shot": zero_shot_prompt(puzzle),
+        "few_shot": few_shot_prompt(puzzle, dataset, num_examples=2, rng=rng, index=index, selection=few_shot),
+        "cot": cot_prompt(puzzle),
+    }
 
-    for idx, item in enumerate(items, start=1):
-        puzzle = item.get("puzzle", "")
-        expected = item.get("expected_answer", "")
 
-        logger.info(f"[{idx}/{len(items)}] Running puzzle id={item.get('id', idx)}")
+def _grade_dict(grade: Any) -> Dict[str, Any]:
+    try:
+        return grade.model_dump()  # pydantic v2
+    except AttributeError:
+        return grade.dict()
+
 
-        try:
-            # zero-shot
-            zs_prompt = zero_shot_prompt(puzzle)
-            zs_msg = [{"role": "user", "content": zs_prompt}]
-            zs_resp_msg = client.chat(messages=zs_msg, temperature=0.0, max_tokens=200)
-            zs_output = _extract_content(zs_resp_msg)
+def answer(client: GroqClientWrapper, prompt: str, max_tokens: int) -> str:
+    resp_msg = client.chat(messages=[{"role": "user", "content": prompt}], temperature=0.0, max_tokens=max_tokens)
+    return _extract_content(resp_msg)
 
-            # few-shot
-            fs_prompt = few_shot_prompt(puzzle, dataset, num_examples=2)
-            fs_msg = [{"role": "user", "content": fs_prompt}]
-            fs_resp_msg = client.chat(messages=fs_msg, temperature=0.0, max_tokens=300)
-            fs_output = _extract_content(fs_resp_msg)
 
-            # CoT
-            cot_prompt_txt = cot_prompt(puzzle)
-            cot_msg = [{"role": "user", "content": cot_prompt_txt}]
-            cot_resp_msg = client.chat(messages=cot_msg, temperature=0.0, max_tokens=400)
-            cot_output = _extract_content(cot_resp_msg)
+def grade_puzzle(client: GroqClientWrapper, puzzle: str, expected: str, outputs: Dict[str, str],
+                 grading: str = "batched", check_agreement: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Grade all answered strategies of one puzzle; returns the journal fields per strategy.
 
+    "batched" uses the local exact-match fast path and one LLM call for the
+    rest; "per-output" is one `grade_score` call per output. With
+    `check_agreement`, every output is also graded per-output as a reference.
+    """
+    if grading == "per-output":
+        grades = {name: (grade_score(client, puzzle, expected, output), "llm_single") for name, output in outputs.items()}
+    else:
+        grades = grade_outputs(client, puzzle, expected, outputs)
+    fields = {}
+    for name, (grade, method) in grades.items():
+        fields[name] = {"output": outputs[name], "grade": _grade_dict(grade), "graded_by": method}
+        if check_agreement:
+            reference = grade if grading == "per-output" else grade_score(client, puzzle, expected, outputs[name])
+            fields[name]["reference_grade"] = _grade_dict(reference)
+    return fields
+
+
+def compact_journal(items: List[Dict[str, Any]], records: Dict[Any, Dict[str, Any]]):
+    """Build results/scores, in dataset order, from the journal's latest record per (id, strategy)."""
+    results: List[Dict[str, Any]] = []
+    scores: List[Dict[str, Any]] = []
+    for idx, item in enumerate(items, start=1):
+        item_id = item.get("id", idx)
+        puzzle = item.get("puzzle", "")
+        expected = item.get("expected_answer", "")
+        found = {name: records.get((item_id, name)) for name in STRATEGIES}
+        failed = [r for r in found.values() if r is None or "error" in r]
+        if not failed:
             results.append(
                 {
-                    "id": item.get("id", idx),
+                    "id": item_id,
                     "puzzle": puzzle,
                     "expected": expected,
-                    "prompts": {
-                        "zero_shot": zs_prompt,
-                        "few_shot": fs_prompt,
-                        "cot": cot_prompt_txt,
-                    },
-                    "outputs": {
-                        "zero_shot": zs_output,
-                        "few_shot": fs_output,
-                        "cot": cot_output,
-                    },
+                    "prompts": {name: r["prompt"] for name, r in found.items()},
+                    "outputs": {name: r["output"] for name, r in found.items()},
                 }
             )
-
-            # grading (with safe model_dump/dict fallback)
-            try:
-                zs_grade = grade_score(client, puzzle, expected, zs_output)
-                zs_grade_dict = zs_grade.model_dump()  # pydantic v2
-            except AttributeError:
-                zs_grade_dict = zs_grade.dict()
-
-            try:
-                fs_grade = grade_score(client, puzzle, expected, fs_output)
-                fs_grade_dict = fs_grade.model_dump()
-            except AttributeError:
-                fs_grade_dict = fs_grade.dict()
-
-            try:
-                cot_grade = grade_score(client, puzzle, expected, cot_output)
-                cot_grade_dict = cot_grade.model_dump()
-            except AttributeError:
-                cot_grade_dict = cot_grade.dict()
-
             scores.append(
                 {
-                    "id": item.get("id", idx),
+                    "id": item_id,
                     "correct": expected,
-                    "zero_shot_grade": zs_grade_dict,
-                    "few_shot_grade": fs_grade_dict,
-                    "cot_grade": cot_grade_dict,
+                    **{f"{name}_grade": r["grade"] for name, r in found.items()},
+                    # journals written before the fast path only have per-output LLM grades
+                    "graded_by": {name: r.get("graded_by", "llm_single") for name, r in found.items()},
                 }
             )
-
-        except Exception as e:
-            logger.exception(f"Error processing item id={item.get('id', idx)}: {e}")
-            # append a placeholder so indices remain consistent
+            if any("reference_grade" in r for r in found.values()):
+                scores[-1]["reference_grades"] = {name: r.get("reference_grade") for name, r in found.items()}
+        else:
+            # a placeholder so indices remain consistent
             results.append(
                 {
-                    "id": item.get("id", idx),
+                    "id": item_id,
                     "puzzle": puzzle,
                     "expected": expected,
                     "prompts": {},
                     "outputs": {"zero_shot": "", "few_shot": "", "cot": ""},
-                    "error": str(e),
+                    "error": next((r["error"] for r in failed if r is not None), "not run"),
                 }
             )
             scores.append(
                 {
-                    "id": item.get("id", idx),
+                    "id": item_id,
                     "correct": expected,
                     "zero_shot_grade": None,
                     "few_shot_grade": None,
                     "cot_grade": None,
                 }
             )
+    return results, scores
+
+
+def run_experiment(
+    dataset_path: Path,
+    outdir: Path,
+    model: str = DEFAULT_MODEL,
+    max_items: Optional[int] = None,
+    save_every: Optional[int] = None,
+    workers: int = 1,
+    requests_per_minute: Optional[float] = REQUESTS_PER_MINUTE,
+    tokens_per_minute: Optional[float] = TOKENS_PER_MINUTE,
+    seed: int = 0,
+    resume: bool = False,
+    response_cache: Optional[ResponseCache] = None,
+    grading: str = "batched",
+    check_agreement: int = 0,
+    few_shot: str = "random",
+):
+    """Run every strategy on every puzzle and grade the outputs.
+
+    Answers run on a pool of `workers` threads, about `workers` puzzles at a
+    time; the next puzzle's answers are queued when the last answer of one
+    arrives. Grading runs on a separate pool of `workers` threads (see
+    `grade_puzzle` for the `grading` modes): "per-output" grades each answer
+    as soon as it exists, "batched" grades a puzzle once all its answers are
+    in. Grading overlaps with other answers and records reach the journal
+    steadily.
+    The first `check_agreement` puzzles are also graded per-output for
+    comparison. All threads share one RateLimiter holding the RPM/TPM
+    budgets. Prompts are built in dataset order from a generator seeded
+    with `seed`, so output files don't
+    depend on `workers`. Few-shot examples come from an ExampleIndex built
+    once for the dataset: `few_shot` is "random" (same picks as before) or
+    "similar" (top TF-IDF matches).
+
+    Every finished pair is appended to `outdir/journal.jsonl`. With `resume`,
+    pairs already in the journal are skipped (failed ones are retried).
+    results.json, scores.json and the report are written once, at the end,
+    from the journal.
+
+    With a `response_cache`, identical requests from earlier runs are served
+    from disk; a replay-only cache makes the whole run offline.
+
+    `save_every` is deprecated and ignored: every record is journaled as it
+    finishes.
+    """
+    if save_every is not None:
+        warnings.warn("save_every is ignored: records are journaled as they finish", DeprecationWarning, stacklevel=2)
+    outdir.mkdir(parents=True, exist_ok=True)
+    dataset = load_dataset(dataset_path)
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    client = GroqClientWrapper(model=model, rate_limiter=limiter, cache=response_cache)
+    journal = RunJournal(outdir / "journal.jsonl", resume=resume, model=model, seed=seed, dataset=str(dataset_path),
+                         few_shot=few_shot)
+    done = journal.completed() if resume else {}
 
-        # periodic save
-        if idx % save_every == 0:
-            with open(outdir / "results.json", "w", encoding="utf-8") as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-            with open(outdir / "scores.json", "w", encoding="utf-8") as f:
-                json.dump(scores, f, indent=2, ensure_ascii=False)
+    items = dataset if max_items is None else dataset[:max_items]
+    rng = random.Random(seed)
+    index = ExampleIndex(dataset, max_neighbors=2)
+    workers = max(1, workers)
+    answer_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="answer")
+    # grading has its own threads so it never queues behind answers of later puzzles
+    grade_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grade")
+    total = sum(any((item.get("id", idx), name) not in done for name in STRATEGIES) for idx, item in enumerate(items, start=1))
+    if done:
+        logger.info(f"Resuming: {len(done)} finished (puzzle, strategy) pairs skipped, {total} puzzles to run")
+
+    def todo_puzzles():
+        for idx, item in enumerate(items, start=1):
+            item_id = item.get("id", idx)
+            # built for skipped items too, so few-shot sampling matches the original run
+            prompts = build_prompts(item.get("puzzle", ""), dataset, rng, index, few_shot)
+            todo = [name for name in STRATEGIES if (item_id, name) not in done]
+            if todo:
+                yield idx, {"item": item, "id": item_id, "prompts": prompts, "todo": todo, "left": len(todo),
+                           "pending": len(todo), "outputs": {}}
 
-    # final save
+    try:
+        # future -> (idx, "answer", [strategy]) or (idx, "grade", [strategies graded by the call])
+        tasks: Dict[Future, Tuple[int, str, List[str]]] = {}
+        puzzles: Dict[int, Dict[str, Any]] = {}
+        upcoming = todo_puzzles()
+
+        def start_next_puzzle() -> None:
+            nxt = next(upcoming, None)
+            if nxt is None:
+                return
+            idx, state = nxt
+            puzzles[idx] = state
+            for name in state["todo"]:
+                tasks[answer_pool.submit(answer, client, state["prompts"][name], STRATEGIES[name])] = (idx, "answer", [name])
+
+        def start_grading(idx: int, state: Dict[str, Any], outputs: Dict[str, str]) -> None:
+            item = state["item"]
+            future = grade_pool.submit(
+                grade_puzzle, client, item.get("puzzle", ""), item.get("expected_answer", ""),
+                outputs, grading, idx <= check_agreement,
+            )
+            tasks[future] = (idx, "grade", list(outputs))
+            state["pending"] += 1
+
+        # only about `workers` puzzles are being answered at a time, so each one is
+        # graded and journaled shortly after it starts instead of at the end of the run
+        for _ in range(workers):
+            start_next_puzzle()
+
+        graded = 0
+        while tasks:
+            finished, _ = wait(list(tasks), return_when=FIRST_COMPLETED)
+            for future in finished:
+                idx, kind, names = tasks.pop(future)
+                state = puzzles[idx]
+                state["pending"] -= 1
+                if kind == "answer":
+                    name = names[0]
+                    try:
+                        state["outputs"][name] = future.result()
+                    except Exception as e:
+                        logger.exception(f"Error processing item id={state['id']} strategy={name}: {e}")
+                        journal.append({"id": state["id"], "strategy": name, "prompt": state["prompts"][name], "error": str(e)})
+                    else:
+                        if grading == "per-output":
+                            # each output is graded on its own, as soon as it exists
+                            start_grading(idx, state, {name: state["outputs"][name]})
+                    state["left"] -= 1
+                    if state["left"] == 0:
+                        start_next_puzzle()
+                        if grading != "per-output" and state["outputs"]:
+                            # batched grading needs every answer of the puzzle
+                            start_grading(idx, state, state["outputs"])
+                else:
+                    try:
+                        fields = future.result()
+                    except Exception as e:
+                        logger.exception(f"Error grading item id={state['id']}: {e}")
+                        fields = {n: {"error": f"grading failed: {e}"} for n in names}
+                    for strategy, record in fields.items():
+                        journal.append({"id": state["id"], "strategy": strategy, "prompt": state["prompts"][strategy], **record})
+                if state["left"] == 0 and state["pending"] == 0:
+                    del puzzles[idx]
+                    graded += 1
+                    logger.info(f"[{graded}/{total}] Finished puzzle id={state['id']}")
+    finally:
+        # on Ctrl+C / errors, calls still queued are cancelled; the ones already
+        # running are waited for, so the journal isn't closed under them
+        answer_pool.shutdown(wait=True, cancel_futures=True)
+        grade_pool.shutdown(wait=True, cancel_futures=True)
+        journal.close()
+
+    results, scores = compact_journal(items, journal.records())
     with open(outdir / "results.json", "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
     with open(outdir / "scores.json", "w", encoding="utf-8") as f:
@@ -177,7 +311,9 @@ def run_experiment(
 
     # generate a comparative report
     generate_report(results, scores, outdir)
-    logger.info("Experiment finished.")
+    logger.info(f"Experiment finished. Rate limiter: {limiter.stats()}")
+    if response_cache is not None:
+        logger.info(f"Response cache: {response_cache.stats()}")
 
 
 def generate_report(results: List[Dict[str, Any]], scores: List[Dict[str, Any]], outdir: Path):
@@ -224,18 +360,90 @@ def generate_report(results: List[Dict[str, Any]], scores: List[Dict[str, Any]],
         cot = (r.get("outputs", {}).get("cot") or "")[:40].replace("|", " ")
         lines.append(f"| {r.get('id')} | {puzzle_short} | {expected} | {zs} | {fs} | {cot} |")
 
+    lines.append("")
+    lines.extend(grading_summary(scores))
+
     with open(outdir / "report.md", "w", encoding="utf-8") as f:
         f.write("\n".join(lines))
 
     logger.info(f"Report written to {outdir / 'report.md'}")
 
 
+def grading_summary(scores: List[Dict[str, Any]]) -> List[str]:
+    """Report lines: how outputs were graded, LLM calls saved, and agreement with per-output grading."""
+    methods: Dict[str, int] = {}
+    batch_calls = 0
+    pairs = []  # (method, grade, reference grade)
+    for s in scores:
+        graded_by = s.get("graded_by") or {}
+        for method in graded_by.values():
+            methods[method] = methods.get(method, 0) + 1
+        batch_calls += "llm_batch" in graded_by.values()
+        for name, reference in (s.get("reference_grades") or {}).items():
+            grade = s.get(f"{name}_grade")
+            if reference and grade:
+                pairs.append((graded_by.get(name), grade, reference))
+
+    total = sum(methods.values())
+    calls = methods.get("llm_single", 0) + batch_calls
+    lines = ["## Grading"]
+    lines.append(f"- Outputs graded: {total} ({', '.join(f'{m}={n}' for m, n in sorted(methods.items())) or 'none'})")
+    lines.append(f"- LLM grading calls: {calls} instead of {total} (saved {total - calls})")
+    if pairs:
+        same = sum(g.get("correctness") == r.get("correctness") for _, g, r in pairs)
+        diffs = [abs(g.get(f, 0) - r.get(f, 0)) for _, g, r in pairs for f in ("correctness", "clarity", "completeness", "conciseness")]
+        lines.append(
+            f"- Agreement with per-output grading on {len(pairs)} outputs: correctness identical for "
+            f"{same / len(pairs):.1%}, mean absolute difference {statistics.mean(diffs):.2f} per field"
+        )
+        for method in sorted({m for m, _, _ in pairs}):
+            subset = [(g, r) for m, g, r in pairs if m == method]
+            agree = sum(g.get("correctness") == r.get("correctness") for g, r in subset)
+            lines.append(f"  - {method}: {agree}/{len(subset)} correctness identical")
+    return lines
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--dataset", required=True, help="Path to dataset JSON")
     parser.add_argument("--outdir", required=True, help="Directory for outputs")
     parser.add_argument("--model", default=DEFAULT_MODEL, help="LLM model to call")
     parser.add_argument("--max-items", type=int, default=None, help="Limit number of items")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent LLM calls")
+    parser.add_argument("--rpm", type=float, default=REQUESTS_PER_MINUTE, help="Requests per minute budget (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=TOKENS_PER_MINUTE, help="Tokens per minute budget (0 = unlimited)")
+    parser.add_argument("--resume", action="store_true", help="Skip puzzles already finished in outdir/journal.jsonl")
+    parser.add_argument("--cache", nargs="?", const=str(RESPONSE_CACHE_PATH), default=None,
+                        help=f"Cache responses on disk (default file: {RESPONSE_CACHE_PATH})")
+    parser.add_argument("--cache-max-mb", type=int, default=RESPONSE_CACHE_MAX_MB, help="Response cache size limit")
+    parser.add_argument("--replay", action="store_true", help="Serve every call from the response cache, never the API")
+    parser.add_argument("--grading", choices=["batched", "per-output"], default="batched",
+                        help="batched: local exact match, then one LLM call per puzzle; per-output: one call per output")
+    parser.add_argument("--few-shot", choices=["random", "similar"], default="random",
+                        help="How few-shot examples are picked: random, or the most similar puzzles (TF-IDF)")
+    parser.add_argument("--check-agreement", type=int, default=0, metavar="N",
+                        help="Also grade the first N puzzles per-output and report agreement")
     args = parser.parse_args()
 
-    run_experiment(Path(args.dataset), Path(args.outdir), model=args.model, max_items=args.max_items)
+    cache = None
+    if args.cache or args.replay:
+        cache = ResponseCache(
+            Path(args.cache or RESPONSE_CACHE_PATH),
+            max_bytes=args.cache_max_mb * 1024 * 1024,
+            replay_only=args.replay,
+        )
+
+    run_experiment(
+        Path(args.dataset),
+        Path(args.outdir),
+        model=args.model,
+        max_items=args.max_items,
+        workers=args.workers,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        resume=args.resume,
+        response_cache=cache,
+        grading=args.grading,
+        check_agreement=args.check_agreement,
+        few_shot=args.few_shot,
+    )
@@ -0,0 +1,95 @@
+"""Client-side rate limiting for Groq calls shared by concurrent workers."""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int = 0) -> int:
+    """Rough request size: ~4 characters per prompt token plus the completion budget."""
+    chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return chars // 4 + 4 * len(messages) + max_tokens
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` units per second, up to `per_minute`."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        missing = amount - self.level
+        return 0.0 if missing <= 0 else missing / self.rate
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets as two token buckets.
+
+    `acquire` blocks until both buckets can pay for a call and takes from both
+    at once, so waiting workers never hold a partial reservation. Token costs
+    are estimated up front; `settle` corrects the bucket with the usage the API
+    actually reported. A limit of 0 / None disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.waited_s = 0.0
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until one request of ~`tokens` tokens fits the budgets; returns seconds waited."""
+        if self.tokens is not None:
+            # a single call larger than the whole budget would otherwise wait forever
+            tokens = min(tokens, self.tokens.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = 0.0
+                for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                    if bucket is not None:
+                        bucket.refill(now)
+                        delay = max(delay, bucket.wait_for(amount))
+                if delay == 0.0:
+                    if self.requests is not None:
+                        self.requests.level -= 1
+                    if self.tokens is not None:
+                        self.tokens.level -= tokens
+                    self.calls += 1
+                    self.waited_s += waited
+                    return waited
+            time.sleep(delay)
+            waited += delay
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Give back (or charge) the difference between estimated and reported token usage."""
+        if self.tokens is None or actual is None:
+            return
+        with self._lock:
+            self.tokens.refill(time.monotonic())
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated - actual)
+
+    def penalize(self, seconds: float) -> None:
+        """Stop all workers for `seconds`, e.g. after the API answered 429."""
+        with self._lock:
+            for bucket in (self.requests, self.tokens):
+                if bucket is not None:
+                    bucket.refill(time.monotonic())
+                    bucket.level = min(bucket.level, 0.0) - seconds * bucket.rate
+        logger.info(f"Rate limited by the API, pausing all workers for {seconds:.1f}s")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"calls": self.calls, "waited_s": round(self.waited_s, 2)}
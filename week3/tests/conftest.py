@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The package lives under src/ and is run from there (python -m ai_prompting.run).
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+
+class FakeClock:
+    """Stands in for the `time` module: sleeping advances monotonic time instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    from ai_prompting import scheduler
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler, "time", fake)
+    return fake
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+from ai_prompting.example_index import ExampleIndex
+from ai_prompting.prompts import few_shot_prompt
+
+DATASET = [
+    {"puzzle": "Alice is taller than Bob. Who is shortest?", "expected_answer": "Bob"},
+    {"puzzle": "Carol is taller than Dan. Who is shortest?", "expected_answer": "Dan"},
+    {"puzzle": "A train leaves at noon going 60 mph. How far by 3pm?", "expected_answer": "180 miles"},
+    {"puzzle": "A car leaves at noon going 30 mph. How far by 2pm?", "expected_answer": "60 miles"},
+    {"puzzle": "What has keys but can't open locks?", "expected_answer": "A piano"},
+    {"puzzle": "Alice is taller than Bob. Who is shortest?", "expected_answer": "Bob"},  # duplicate text
+    {"puzzle": "Unanswered puzzle about trains", "expected_answer": ""},
+]
+
+
+def test_random_selection_matches_the_unindexed_scan():
+    index = ExampleIndex(DATASET)
+    for item in DATASET:
+        for seed in range(5):
+            indexed = few_shot_prompt(item["puzzle"], DATASET, 2, rng=random.Random(seed), index=index)
+            scanned = few_shot_prompt(item["puzzle"], DATASET, 2, rng=random.Random(seed))
+            assert indexed == scanned
+
+
+def test_candidates_need_an_expected_answer():
+    index = ExampleIndex(DATASET)
+    assert all(d["expected_answer"] for d in index.candidates)
+    assert index.stats()["candidates"] == 6
+
+
+def test_similar_ranks_by_shared_terms_and_skips_the_same_puzzle():
+    index = ExampleIndex(DATASET)
+    puzzle = DATASET[0]["puzzle"]
+    chosen = index.select(puzzle, 1, method="similar")
+    assert chosen == [DATASET[1]]
+    assert all(d["puzzle"] != puzzle for d in index.select(puzzle, 5, method="similar"))
+
+
+def test_unseen_puzzle_and_large_k_take_the_direct_path():
+    index = ExampleIndex(DATASET, max_neighbors=2)
+    assert index.select("A bus leaves at noon going 40 mph. How far by 1pm?", 1, method="similar")[0] in DATASET[2:4]
+    puzzle = DATASET[2]["puzzle"]
+    assert index.similar(puzzle, 2) == index.similar(puzzle, 4)[:2]
+    assert len(index.similar(puzzle, 10)) == 5  # every other candidate, no padding
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 512])
+def test_neighbours_do_not_depend_on_block_size(block_size):
+    reference = ExampleIndex(DATASET)
+    index = ExampleIndex(DATASET, block_size=block_size)
+    index.build()
+    index.build()  # idempotent
+    for item in DATASET:
+        assert index.similar(item["puzzle"], 3) == reference.similar(item["puzzle"], 3)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        ExampleIndex(DATASET).select("x", 1, method="closest")
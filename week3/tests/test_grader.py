@@ -0,0 +1,104 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from ai_prompting.grader import final_answer, grade_many, grade_outputs, local_grade, normalize_answer
+from ai_prompting.response_cache import ReplayMiss
+
+
+class ScriptedClient:
+    """Answers grading calls with canned replies, in order, and records the prompts."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def chat(self, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(content=reply if isinstance(reply, str) else json.dumps(reply))
+
+
+def scores(quality):
+    return (quality.correctness, quality.clarity, quality.completeness, quality.conciseness)
+
+
+GOOD = {"correctness": 3, "clarity": 3, "completeness": 2, "conciseness": 2}
+
+
+def test_normalize_and_final_answer():
+    assert normalize_answer("  Alice,  then BOB! ") == "alice then bob"
+    assert final_answer("Step 1: think.\nAnswer: the red house") == "the red house"
+
+
+@pytest.mark.parametrize("output", ["Alice", "answer: alice.", "  ALICE "])
+def test_exact_short_answer_is_graded_locally(output):
+    quality, method = local_grade("Alice", output)
+    assert method == "exact"
+    assert scores(quality) == (3, 1, 1, 3)
+
+
+@pytest.mark.parametrize("expected, output", [
+    ("Alice", "Alicia"),
+    ("Alice, Bob", "Alice and Bob"),
+    ("Alice, Bob", "Bob, Alice"),
+    ("Alice", "Step 1: compare.\nStep 2: pick.\nAnswer: Alice"),
+])
+def test_anything_but_an_exact_short_answer_goes_to_the_llm(expected, output):
+    assert local_grade(expected, output) is None
+
+
+def test_empty_output_scores_zero():
+    quality, method = local_grade("Alice", "   ")
+    assert (method, scores(quality)) == ("empty", (0, 0, 0, 0))
+
+
+def test_grade_many_uses_neutral_labels_and_maps_them_back():
+    client = ScriptedClient({"response_1": GOOD, "response_2": {**GOOD, "correctness": 9}})
+    grades = grade_many(client, "puzzle", "Alice", {"cot": "long answer", "few_shot": "other answer"})
+    assert "cot" not in client.prompts[0] and "[response_2]" in client.prompts[0]
+    assert grades["cot"][1] == "llm_batch"
+    assert scores(grades["cot"][0]) == (3, 3, 2, 2)
+    assert grades["few_shot"][0].correctness == 3  # clamped to the rubric
+
+
+def test_grade_many_grades_missing_labels_one_by_one():
+    client = ScriptedClient({"response_1": GOOD, "response_2": "not a grade"}, {**GOOD, "correctness": 1})
+    grades = grade_many(client, "puzzle", "Alice", {"cot": "a", "few_shot": "b"})
+    assert grades["cot"][1] == "llm_batch"
+    assert grades["few_shot"][1] == "llm_single"
+    assert grades["few_shot"][0].correctness == 1
+
+
+def test_unparseable_batch_reply_falls_back_to_single_calls():
+    client = ScriptedClient("not json", GOOD, GOOD)
+    grades = grade_many(client, "puzzle", "Alice", {"cot": "a", "few_shot": "b"})
+    assert {method for _, method in grades.values()} == {"llm_single"}
+    assert len(client.prompts) == 3
+
+
+def test_replay_miss_is_not_turned_into_a_zero_score():
+    with pytest.raises(ReplayMiss):
+        grade_many(ScriptedClient(ReplayMiss("miss")), "puzzle", "Alice", {"cot": "a", "few_shot": "b"})
+    with pytest.raises(ReplayMiss):
+        grade_many(ScriptedClient(ReplayMiss("miss")), "puzzle", "Alice", {"cot": "a"})
+
+
+def test_grade_outputs_only_sends_what_local_grading_cannot_settle():
+    client = ScriptedClient(GOOD)
+    grades = grade_outputs(client, "puzzle", "Alice", {"zero_shot": "Alice", "few_shot": "", "cot": "Bob"})
+    assert list(grades) == ["zero_shot", "few_shot", "cot"]
+    assert [method for _, method in grades.values()] == ["exact", "empty", "llm_single"]
+    assert len(client.prompts) == 1
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ({"correctness": 5, "clarity": "2", "completeness": -1}, (3, 2, 0, 0)),
+    ("not json", (0, 0, 0, 0)),
+    ({"correctness": "high"}, (0, 0, 0, 0)),
+])
+def test_single_grades_are_clamped_like_batched_ones(reply, expected):
+    (quality, method), = grade_many(ScriptedClient(reply), "puzzle", "Alice", {"cot": "a"}).values()
+    assert (method, scores(quality)) == ("llm_single", expected)
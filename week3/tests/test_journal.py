@@ -0,0 +1,67 @@
+from ai_prompting.journal import RunJournal
+
+
+def reopen(path, method):
+    journal = RunJournal(path, resume=True)
+    try:
+        return getattr(journal, method)()
+    finally:
+        journal.close()
+
+
+def test_records_keep_the_latest_per_item(tmp_path):
+    path = tmp_path / "results.jsonl"
+    journal = RunJournal(path, model="m", seed=0)
+    journal.append({"id": 1, "strategy": "cot", "error": "timeout"})
+    journal.append({"id": 1, "strategy": "zero_shot", "output": "a"})
+    journal.append({"id": 1, "strategy": "cot", "output": "b"})
+    journal.close()
+
+    reread = RunJournal(path, resume=True, model="m", seed=0)
+    assert reread.header() == {"type": "run", "model": "m", "seed": 0}
+    assert reread.records()[(1, "cot")]["output"] == "b"
+    assert set(reread.completed()) == {(1, "cot"), (1, "zero_shot")}
+    reread.close()
+
+
+def test_completed_excludes_errors(tmp_path):
+    journal = RunJournal(tmp_path / "results.jsonl")
+    journal.append({"id": 2, "strategy": "cot", "error": "boom"})
+    assert (2, "cot") in journal.records()
+    assert journal.completed() == {}
+    journal.close()
+
+
+def test_resume_appends_instead_of_truncating(tmp_path):
+    path = tmp_path / "results.jsonl"
+    journal = RunJournal(path)
+    journal.append({"id": 1, "strategy": "cot", "output": "a"})
+    journal.close()
+    resumed = RunJournal(path, resume=True)
+    resumed.append({"id": 2, "strategy": "cot", "output": "b"})
+    resumed.close()
+    assert set(reopen(path, "completed")) == {(1, "cot"), (2, "cot")}
+
+
+def test_resume_skips_a_torn_last_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    journal = RunJournal(path)
+    journal.append({"id": 1, "strategy": "cot", "output": "a"})
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(b'{"type": "item", "id": 2, "strat')  # crashed mid-write
+
+    resumed = RunJournal(path, resume=True)
+    resumed.append({"id": 3, "strategy": "cot", "output": "c"})
+    resumed.close()
+
+    lines = path.read_bytes().split(b"\n")
+    assert lines[2].startswith(b'{"type": "item", "id": 2')
+    assert set(reopen(path, "completed")) == {(1, "cot"), (3, "cot")}
+
+
+def test_resume_without_a_journal_starts_a_new_one(tmp_path):
+    path = tmp_path / "results.jsonl"
+    journal = RunJournal(path, resume=True, model="m")
+    journal.close()
+    assert reopen(path, "header") == {"type": "run", "model": "m"}
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+from ai_prompting.llm_client import GroqClientWrapper
+from ai_prompting.response_cache import ReplayMiss, ResponseCache, request_key
+
+MESSAGES = [{"role": "user", "content": "2 + 2?"}]
+
+
+class FakeCompletions:
+    def __init__(self, reply="4"):
+        self.reply = reply
+        self.calls = 0
+
+    def create(self, **params):
+        self.calls += 1
+        message = SimpleNamespace(role="assistant", content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def wrapper(cache, completions=None):
+    client = GroqClientWrapper(api_key="test", model="m", cache=cache)
+    if completions is not None:
+        client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client
+
+
+def test_request_key_depends_on_every_parameter():
+    base = request_key("m", MESSAGES, 0.0, 300, None)
+    assert request_key("m", [dict(m) for m in MESSAGES], 0, 300, None) == base
+    assert request_key("other", MESSAGES, 0.0, 300, None) != base
+    assert request_key("m", MESSAGES, 0.0, 200, None) != base
+    assert request_key("m", MESSAGES, 0.0, 300, {"type": "json_object"}) != base
+
+
+def test_second_identical_call_is_served_from_disk(tmp_path):
+    completions = FakeCompletions()
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    client = wrapper(cache, completions)
+    first = client.chat(MESSAGES)
+    second = client.chat(MESSAGES)
+    assert (first.content, second.content) == ("4", "4")
+    assert completions.calls == 1
+    assert cache.stats()["hits"] == 1
+    cache.close()
+
+
+def test_replay_answers_from_a_recorded_run_without_a_client(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    recorder = ResponseCache(path)
+    wrapper(recorder, FakeCompletions("recorded")).chat(MESSAGES, max_tokens=50)
+    recorder.close()
+
+    replay = ResponseCache(path, replay_only=True)
+    client = GroqClientWrapper(model="m", cache=replay)
+    assert client.client is None
+    assert client.chat(MESSAGES, max_tokens=50).content == "recorded"
+    with pytest.raises(ReplayMiss):
+        client.chat(MESSAGES, max_tokens=51)
+    assert replay.stats()["misses"] == 1
+    replay.close()
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_bytes=300)
+    for i in range(5):
+        cache.put(f"k{i}", "m", {"content": "x" * 80})
+        cache.get("k0")  # keep k0 recently used
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+    assert cache.stats()["bytes"] <= 300
+    assert cache.evictions > 0
+    cache.close()
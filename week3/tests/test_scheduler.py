@@ -0,0 +1,47 @@
+import pytest
+from ai_prompting.scheduler import RateLimiter, estimate_tokens
+
+
+def test_estimate_tokens_counts_prompt_and_completion_budget():
+    messages = [{"role": "user", "content": "x" * 400}]
+    assert estimate_tokens(messages, max_tokens=300) == 100 + 4 + 300
+
+
+def test_requests_within_budget_do_not_wait(clock):
+    limiter = RateLimiter(requests_per_minute=3)
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert clock.slept == []
+
+
+def test_request_over_budget_waits_for_refill(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(60):
+        limiter.acquire()
+    assert limiter.acquire() == pytest.approx(1.0)
+    assert limiter.stats() == {"calls": 61, "waited_s": 1.0}
+
+
+def test_token_budget_waits_and_settle_gives_back_unused_tokens(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+    assert limiter.acquire(600) == 0.0
+    limiter.settle(estimated=600, actual=300)
+    assert limiter.acquire(300) == 0.0
+    # empty again: 60 tokens refill in 6s at 10 tokens/s
+    assert limiter.acquire(60) == pytest.approx(6.0)
+
+
+def test_call_larger_than_the_budget_still_runs(clock):
+    limiter = RateLimiter(tokens_per_minute=100)
+    assert limiter.acquire(1000) == 0.0
+
+
+def test_penalize_pauses_every_caller(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    limiter.penalize(5.0)
+    # 5s of debt, then one request's worth (1s at 1/s)
+    assert limiter.acquire() == pytest.approx(6.0)
+
+
+def test_no_limits_never_wait(clock):
+    limiter = RateLimiter()
+    assert all(limiter.acquire(10 ** 6) == 0.0 for _ in range(100))